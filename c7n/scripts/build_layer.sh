@@ -56,6 +56,9 @@ find . -type d -name "examples" -exec rm -rf {} + 2>/dev/null || true
 
 cd ../../../../../../
 
+# Measure the stripped install tree (Lambda's 250MB limit applies to unzipped size)
+UNZIPPED_MB=$(du -sm ${LAYER_DIR}/python | cut -f1)
+
 # Create zip file
 echo "Creating layer zip file..."
 cd ${LAYER_DIR}
@@ -74,9 +77,10 @@ echo "Build completed successfully!"
 echo "======================================"
 echo "Layer file: ${LAYER_DIR}/${LAYER_NAME}.zip"
 echo "Size: ${SIZE} (${SIZE_MB}MB)"
+echo "Unzipped size: ${UNZIPPED_MB}MB"
 echo ""
 
-if [ ${SIZE_MB} -gt 250 ]; then
+if [ ${UNZIPPED_MB} -gt 250 ]; then
     echo "⚠️  WARNING: Layer size exceeds 250MB!"
     echo "    Lambda has a 250MB limit for unzipped layers."
     echo "    Consider further optimization or use a container image."
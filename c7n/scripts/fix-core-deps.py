@@ -7,6 +7,7 @@ Based on community solution from GitHub Issue #10282
 import os
 import sys
 import shutil
+import tempfile
 from pathlib import Path
 
 def find_deploy_py():
@@ -59,9 +60,19 @@ def fix_core_deps(deploy_py_path):
         print("❌ Could not find CORE_DEPS section to modify")
         return False
     
-    # Write the modified content back
-    with open(deploy_py_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
+    # Write the modified content to a temp file and atomically swap it in,
+    # so an interrupted run never leaves a truncated deploy.py behind
+    fd, tmp_path = tempfile.mkstemp(dir=deploy_py_path.parent, suffix='.py')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        shutil.copymode(deploy_py_path, tmp_path)
+        os.replace(tmp_path, deploy_py_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
     
     print("✅ Successfully modified deploy.py")
     return True
@@ -16,19 +16,150 @@ import boto3
 import json
 import logging
 import os
-import tempfile
+import threading
 import yaml
+from botocore.config import Config as BotocoreConfig
 from botocore.exceptions import ClientError
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, IO, Union
 
 # Import the event filter builder for resource filtering
 import event_filter_builder
 
-logger = logging.getLogger()
-logger.setLevel(os.getenv('LOG_LEVEL', 'INFO'))
+# Use the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
 
-# Note: Cloud Custodian logger configuration moved to _execute_custodian_policy()
-# (after c7n imports, since c7n resets logging configuration on import)
+logger = logging.getLogger(__name__)
+
+# Import Cloud Custodian and load the AWS resource providers at module scope so
+# the Lambda init phase pays for them once instead of every policy execution.
+# Guarded so this module stays importable where c7n is not installed (unit tests).
+try:
+    from c7n.policy import PolicyCollection
+    from c7n.config import Config
+    from c7n import resources as c7n_resources
+    C7N_AVAILABLE = True
+except ImportError:
+    PolicyCollection = None
+    Config = None
+    c7n_resources = None
+    C7N_AVAILABLE = False
+
+_c7n_resources_loaded = False
+
+# Central-account S3 clients keyed by region, reused across warm invocations
+S3_CLIENT_CONFIG = BotocoreConfig(retries={'max_attempts': 2, 'mode': 'standard'}, tcp_keepalive=True)
+_s3_clients: Dict[str, Any] = {}
+
+# Serializes installation of the SQS invocation-ID hook when policies run in parallel
+_api_call_patch_lock = threading.Lock()
+
+# Per-thread boto3 sessions keyed by (account, region); threads of the policy
+# pool outlive invocations, so sessions are reused across warm invocations
+_thread_sessions = threading.local()
+
+
+def install_invocation_id_hook() -> None:
+    """
+    Patch botocore once per container so SQS SendMessage calls carry the invocation ID
+    
+    The hook reads C7N_INVOCATION_ID on every call, so a single installation
+    serves all later invocations and policy threads.
+    """
+    import botocore.client
+    
+    with _api_call_patch_lock:
+        if hasattr(botocore.client.BaseClient, '_original_make_api_call'):
+            return
+        botocore.client.BaseClient._original_make_api_call = botocore.client.BaseClient._make_api_call
+        
+        def make_api_call_with_invocation_id(self, operation_name, api_params):
+            # Only modify SQS SendMessage operations
+            if operation_name == 'SendMessage' and self._service_model.service_name == 'sqs':
+                # CRITICAL: Get current invocation ID dynamically, not from closure
+                current_invocation_id = os.getenv('C7N_INVOCATION_ID')
+                if current_invocation_id:
+                    logger.info(f"🔧 Intercepting SQS SendMessage - adding InvocationId: {current_invocation_id}")
+                    if 'MessageAttributes' not in api_params:
+                        api_params['MessageAttributes'] = {}
+                    api_params['MessageAttributes']['InvocationId'] = {
+                        'StringValue': current_invocation_id,
+                        'DataType': 'String'
+                    }
+                    logger.info(f"✅ MessageAttributes now includes: {list(api_params['MessageAttributes'].keys())}")
+            return botocore.client.BaseClient._original_make_api_call(self, operation_name, api_params)
+        
+        botocore.client.BaseClient._make_api_call = make_api_call_with_invocation_id
+
+
+def load_c7n_resources() -> None:
+    """Load the AWS Cloud Custodian resource providers once per container"""
+    global _c7n_resources_loaded
+    if _c7n_resources_loaded:
+        return
+    
+    try:
+        c7n_resources.load_resources(['aws.*'])
+    except Exception as e:
+        logger.warning(f"Could not load specific AWS resources, falling back to default: {e}")
+        import c7n.resources.aws
+    _c7n_resources_loaded = True
+
+
+if C7N_AVAILABLE:
+    load_c7n_resources()
+
+# c7n output and resource cache directories, shared by every run in a warm container
+C7N_OUTPUT_DIR = '/tmp/custodian-output'
+C7N_CACHE_DIR = '/tmp/custodian-cache'
+# Minutes c7n may reuse cached describe results across runs. Off by default because
+# event-driven policies must see the resource the triggering event just changed.
+C7N_CACHE_PERIOD = int(os.getenv('C7N_CACHE_PERIOD', '0'))
+
+for _c7n_dir in (C7N_OUTPUT_DIR, C7N_CACHE_DIR):
+    os.makedirs(_c7n_dir, exist_ok=True)
+
+# Identifying event fields echoed back in execution results (the full event stays out of responses)
+RESULT_EVENT_FIELDS = (
+    'event_name', 'event_source', 'event_time', 'aws_region', 'source_account',
+    'creator_name', 'bucket_name', 'instance_id', 'group_id', 'username',
+    'load_balancer_arn', 'listener_arn', 'finding_type', 'finding_id',
+)
+
+
+def summarize_event_info(event_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce event info to the identifying fields returned in execution results
+    
+    Args:
+        event_info: Validated event information (includes raw_event)
+        
+    Returns:
+        Dict with only the identifying fields present in event_info
+    """
+    return {k: event_info[k] for k in RESULT_EVENT_FIELDS if k in event_info}
+
+
+def get_s3_client(region: str):
+    """
+    Get the shared central-account S3 client for a region, creating it on first use
+    
+    Args:
+        region: AWS region name
+        
+    Returns:
+        boto3 S3 client
+    """
+    s3_client = _s3_clients.get(region)
+    if s3_client is None:
+        s3_client = _s3_clients[region] = boto3.client('s3', region_name=region, config=S3_CLIENT_CONFIG)
+    return s3_client
+
+
+# Note: Cloud Custodian logger configuration is done in _execute_custodian_policy()
+# (c7n resets logging configuration on import)
 
 
 class CrossAccountSessionFactory:
@@ -48,7 +179,7 @@ class CrossAccountExecutor:
     Handles cross-account Cloud Custodian policy execution
     """
     
-    def __init__(self, account_id: str, region: str, role_name: str = None, external_id_prefix: str = None, environment: str = None):
+    def __init__(self, account_id: str, region: str, role_name: str = None, external_id_prefix: str = None, environment: str = None, base_session: boto3.Session = None):
         """
         Initialize cross-account executor
         
@@ -58,12 +189,14 @@ class CrossAccountExecutor:
             role_name: IAM role name to assume (default: CloudCustodianExecutionRole)
             external_id_prefix: Prefix for external ID (default: cloud-custodian)
             environment: Environment name (e.g., dev, prod) from account mapping
+            base_session: Shared session with the Lambda's own credentials (default: boto3 default session)
         """
         self.account_id = account_id
         self.region = region
         self.role_name = role_name or os.getenv('CROSS_ACCOUNT_ROLE_NAME', 'CloudCustodianExecutionRole')
         self.external_id_prefix = external_id_prefix or os.getenv('EXTERNAL_ID_PREFIX', 'cloud-custodian')
         self.environment = environment
+        self.base_session = base_session
         self.session = None
         self.credentials = None
         
@@ -90,7 +223,7 @@ class CrossAccountExecutor:
         Raises:
             ClientError: If role assumption fails
         """
-        sts_client = boto3.client('sts')
+        sts_client = self.base_session.client('sts') if self.base_session else boto3.client('sts')
         
         try:
             logger.info(f"Assuming role in account {self.account_id}: {self.role_arn}")
@@ -144,6 +277,39 @@ class CrossAccountExecutor:
             
             raise
     
+    def get_thread_session(self) -> boto3.Session:
+        """
+        Get a boto3 session private to the calling thread
+        
+        boto3 Sessions are not thread-safe, so each policy thread builds its own
+        from the assumed-role credentials (member accounts) or the Lambda's own
+        credentials (central account). The session is kept per thread and reused
+        by later invocations until the account's credentials change.
+        
+        Returns:
+            boto3 Session for the target account and region
+        """
+        sessions = getattr(_thread_sessions, 'sessions', None)
+        if sessions is None:
+            sessions = _thread_sessions.sessions = {}
+        
+        access_key = self.credentials['AccessKeyId'] if self.credentials else None
+        cached = sessions.get((self.account_id, self.region))
+        if cached is not None and cached[0] == access_key:
+            return cached[1]
+        
+        if self.credentials:
+            session = boto3.Session(
+                aws_access_key_id=self.credentials['AccessKeyId'],
+                aws_secret_access_key=self.credentials['SecretAccessKey'],
+                aws_session_token=self.credentials['SessionToken'],
+                region_name=self.region
+            )
+        else:
+            session = boto3.Session(region_name=self.region)
+        sessions[(self.account_id, self.region)] = (access_key, session)
+        return session
+    
     def get_client(self, service_name: str):
         """
         Get boto3 client with cross-account credentials
@@ -171,7 +337,7 @@ class CrossAccountExecutor:
             Policy file content as string
         """
         # Use central account credentials for S3 access (policies stored in central account)
-        s3_client = boto3.client('s3', region_name=self.region)
+        s3_client = get_s3_client(self.region)
         
         logger.info(f"Downloading policy file from s3://{bucket}/{key}")
         
@@ -184,12 +350,12 @@ class CrossAccountExecutor:
             logger.error(f"Failed to download policy file: {str(e)}")
             raise
     
-    def parse_policy_file(self, policy_content: str) -> Dict[str, Any]:
+    def parse_policy_file(self, policy_content: Union[str, bytes, IO]) -> Dict[str, Any]:
         """
         Parse YAML policy file content
         
         Args:
-            policy_content: Policy file content as string
+            policy_content: Policy file content as string, bytes or a readable stream
             
         Returns:
             Parsed policy dictionary
@@ -197,7 +363,7 @@ class CrossAccountExecutor:
         logger.info("Parsing policy file")
         
         try:
-            policy_data = yaml.safe_load(policy_content)
+            policy_data = yaml.load(policy_content, Loader=YamlSafeLoader)
             
             if not isinstance(policy_data, dict):
                 raise ValueError("Invalid policy file: root must be a dictionary")
@@ -300,9 +466,8 @@ class CrossAccountExecutor:
         Returns:
             Execution results
         """
-        from c7n.policy import PolicyCollection
-        from c7n.config import Config
-        from c7n import resources
+        if not C7N_AVAILABLE:
+            raise RuntimeError("Cloud Custodian (c7n) is not installed")
         
         # CRITICAL: Configure Cloud Custodian loggers AFTER import (c7n resets logging on import)
         c7n_loggers = ['custodian', 'c7n', 'c7n.policy', 'c7n.policies', 'custodian.policy',
@@ -313,15 +478,18 @@ class CrossAccountExecutor:
             c7n_logger.propagate = True
         logger.info("Cloud Custodian loggers configured to DEBUG level")
         
-        # Load AWS Cloud Custodian resource providers
-        try:
-            resources.load_resources(['aws.*'])
-        except Exception as e:
-            logger.warning(f"Could not load specific AWS resources, falling back to default: {e}")
-            import c7n.resources.aws
+        # No-op after the first call - providers are loaded at import time
+        load_c7n_resources()
         
         logger.info(f"Executing Cloud Custodian policy: {policy.get('name')} in account {self.account_id}")
         
+        # Session owned by this thread - c7n builds its clients from it during the run
+        session = self.get_thread_session()
+        
+        # Work on a shallow copy with its own filter list - the caller's policy dict
+        # (possibly a cached parse of the policy file) is never modified
+        policy = {**policy, 'filters': list(policy.get('filters', []))}
+        
         # =======================================================================
         # STEP 1: BUILD FILTERS USING EVENT_FILTER_BUILDER
         # =======================================================================
@@ -338,22 +506,19 @@ class CrossAccountExecutor:
             filter_result = event_filter_builder.build_filters_and_resources(
                 event_info=event_info,
                 resource_type=resource_type,
-                session=self.session,
+                session=session,
                 region=self.region
             )
-            logger.info(f"Filter result: {filter_result}") 
+            logger.debug("Filter result: %s", filter_result)
             filters = filter_result.get('filters', [])
-            logger.info(f"Built filters: {filters}")
+            logger.info("Built filters: %s", filters)
             provided_resources = filter_result.get('provided_resources')
-            logger.info(f"Provided resources: {provided_resources}")
+            logger.debug("Provided resources: %s", provided_resources)
             
             if filters:
                 logger.info(f"Built {len(filters)} filters from event")
-                if 'filters' not in policy:
-                    policy['filters'] = []
-                # Insert event-based filters at the beginning
-                for f in reversed(filters):
-                    policy['filters'].insert(0, f)
+                # Event-based filters go at the beginning
+                policy['filters'] = filters + policy['filters']
             
             if provided_resources:
                 logger.info(f"Pre-fetched {len(provided_resources)} resources from AWS API")
@@ -373,7 +538,9 @@ class CrossAccountExecutor:
                 if isinstance(resource, dict):
                     # Always set c7n:CreatorName
                     resource['c7n:CreatorName'] = creator_name
-                    logger.debug(f"Added c7n:CreatorName='{creator_name}' to resource {idx}: {resource.get('Name', resource.get('InstanceId', 'unknown'))}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Added c7n:CreatorName='%s' to resource %s: %s", creator_name, idx,
+                                     resource.get('Name', resource.get('InstanceId', 'unknown')))
                     
                     # For EC2, also add to Tags for visibility
                     if policy.get('resource') == 'aws.ec2' and 'Tags' in resource:
@@ -404,17 +571,12 @@ class CrossAccountExecutor:
             field_value = event_info.get(field_name)
             if field_value and policy.get('resource') == expected_resource:
                 logger.info(f"Applying legacy filter: {filter_key}={field_value}")
-                if 'filters' not in policy:
-                    policy['filters'] = []
-                # Remove any existing filters for this key
-                policy['filters'] = [f for f in policy['filters'] 
-                                   if not (f.get('key') == filter_key)]
-                # Add the legacy filter
-                policy['filters'].insert(0, {
+                # Put the legacy filter first, replacing any existing filters for this key
+                policy['filters'] = [{
                     'type': 'value',
                     'key': filter_key,
                     'value': field_value
-                })
+                }] + [f for f in policy['filters'] if not (f.get('key') == filter_key)]
         
         # Special handling for listener ARN -> load balancer ARN extraction
         listener_arn = event_info.get('listener_arn')
@@ -427,13 +589,11 @@ class CrossAccountExecutor:
                 lb_arn = ':'.join(parts[:5]) + ':loadbalancer/' + '/'.join(resource_parts[1:4])
                 logger.info(f"Extracted ALB ARN from listener: {lb_arn}")
                 
-                if 'filters' not in policy:
-                    policy['filters'] = []
-                policy['filters'].insert(0, {
+                policy['filters'] = [{
                     'type': 'value',
                     'key': 'LoadBalancerArn',
                     'value': lb_arn
-                })
+                }] + policy['filters']
             except Exception as e:
                 logger.warning(f"Could not extract load balancer ARN from listener ARN: {e}")
         
@@ -444,11 +604,6 @@ class CrossAccountExecutor:
             'policies': [policy]
         }
         
-        # Create temporary file for policy
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as tmp_file:
-            yaml.dump(policy_config, tmp_file)
-            tmp_policy_path = tmp_file.name
-        
         try:
             # Extract raw event data for policy context
             raw_event = event_info.get('raw_event', {})
@@ -459,8 +614,9 @@ class CrossAccountExecutor:
                 region=self.region,
                 account_id=self.account_id,
                 log_group=f'/c7n/lambda/cloud-custodian-cross-account',
-                output_dir='/tmp/custodian-output',
-                cache='/tmp/custodian-cache',
+                output_dir=C7N_OUTPUT_DIR,
+                cache=C7N_CACHE_DIR,
+                cache_period=C7N_CACHE_PERIOD,
                 dryrun=dryrun,
                 verbose=True,  # Enable verbose mode for detailed filter/action execution logs
                 variables={
@@ -478,7 +634,7 @@ class CrossAccountExecutor:
             for p in collection:
                 logger.info(f"Running policy: {p.name} in account {self.account_id}")                
                 # Store session references
-                cross_account_session = self.session
+                cross_account_session = session
                 cross_account_region = self.region
                 cross_account_id = self.account_id
                 policy_resource_type = p.resource_type
@@ -543,30 +699,7 @@ class CrossAccountExecutor:
                 invocation_id = os.getenv('C7N_INVOCATION_ID')
                 if invocation_id:
                     logger.info(f"Injecting invocation ID {invocation_id} into SQS messages")
-                    import botocore.client
-                    
-                    # Store original make_api_call method if not already stored
-                    if not hasattr(botocore.client.BaseClient, '_original_make_api_call'):
-                        botocore.client.BaseClient._original_make_api_call = botocore.client.BaseClient._make_api_call
-                    
-                    def make_api_call_with_invocation_id(self, operation_name, api_params):
-                        # Only modify SQS SendMessage operations
-                        if operation_name == 'SendMessage' and self._service_model.service_name == 'sqs':
-                            # CRITICAL: Get current invocation ID dynamically, not from closure
-                            current_invocation_id = os.getenv('C7N_INVOCATION_ID')
-                            if current_invocation_id:
-                                logger.info(f"🔧 Intercepting SQS SendMessage - adding InvocationId: {current_invocation_id}")
-                                if 'MessageAttributes' not in api_params:
-                                    api_params['MessageAttributes'] = {}
-                                api_params['MessageAttributes']['InvocationId'] = {
-                                    'StringValue': current_invocation_id,
-                                    'DataType': 'String'
-                                }
-                                logger.info(f"✅ MessageAttributes now includes: {list(api_params['MessageAttributes'].keys())}")
-                        return botocore.client.BaseClient._original_make_api_call(self, operation_name, api_params)
-                    
-                    # Replace the method for this policy execution
-                    botocore.client.BaseClient._make_api_call = make_api_call_with_invocation_id
+                    install_invocation_id_hook()
                 
                 # Run the policy (resources already enriched with creator info if pre-fetched)
                 # Cloud Custodian's Policy.run() doesn't accept arguments
@@ -634,7 +767,7 @@ class CrossAccountExecutor:
                 'success': True,
                 'account_id': self.account_id,
                 'policy_name': policy.get('name'),
-                'event_info': event_info,
+                'event_info': summarize_event_info(event_info),
                 'results': results,
                 'dryrun': dryrun,
             }
@@ -645,17 +778,10 @@ class CrossAccountExecutor:
                 'success': False,
                 'account_id': self.account_id,
                 'policy_name': policy.get('name'),
-                'event_info': event_info,
+                'event_info': summarize_event_info(event_info),
                 'error': str(e),
                 'dryrun': dryrun,
             }
-        
-        finally:
-            # Cleanup temporary file
-            try:
-                os.unlink(tmp_policy_path)
-            except:
-                pass
 
     def test_connectivity(self) -> Dict[str, Any]:
         """
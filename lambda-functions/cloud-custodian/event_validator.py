@@ -11,13 +11,135 @@ import logging
 import os
 from typing import Dict, Any, Optional, List
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+# Optional import - fall back to stdlib json if orjson is not in the layer
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Supported EventBridge detail-types
+CLOUDTRAIL_DETAIL_TYPE = 'AWS API Call via CloudTrail'
+SECURITYHUB_DETAIL_TYPE = 'Security Hub Findings - Imported'
+GUARDDUTY_DETAIL_TYPE = 'GuardDuty Finding'
+
+# CloudTrail event sources this Lambda typically handles (others are processed with a warning)
+SUPPORTED_EVENT_SOURCES = frozenset({
+    's3.amazonaws.com',
+    'ec2.amazonaws.com',
+    'iam.amazonaws.com',
+    'securityhub.amazonaws.com',
+    'guardduty.amazonaws.com',
+    'macie.amazonaws.com',
+    'config.amazonaws.com',
+    'lambda.amazonaws.com',
+    'rds.amazonaws.com',
+    'dynamodb.amazonaws.com',
+    'cloudfront.amazonaws.com',
+    'elasticloadbalancing.amazonaws.com',
+    'cloudtrail.amazonaws.com',
+    'cloudwatch.amazonaws.com',
+    'autoscaling.amazonaws.com',
+    'sns.amazonaws.com',
+    'sqs.amazonaws.com',
+    'kms.amazonaws.com',
+    'logs.amazonaws.com',
+    'events.amazonaws.com',
+    'redshift.amazonaws.com',
+    'efs.amazonaws.com',
+    'eks.amazonaws.com',
+    'codecommit.amazonaws.com',
+    'secretsmanager.amazonaws.com',
+    'ssm.amazonaws.com',
+})
+
+# Top-level EventBridge fields every supported event must carry, with their expected types
+REQUIRED_EVENT_FIELDS = (
+    ('detail-type', str),
+    ('detail', dict),
+)
+
+
+def check_event_shape(event: Any) -> None:
+    """
+    Check the top-level shape of an EventBridge event before any extraction
+    
+    Args:
+        event: Incoming Lambda event
+        
+    Raises:
+        ValueError: If the event is not a dict or a required field is missing or mistyped
+    """
+    if not isinstance(event, dict):
+        raise ValueError("Invalid event: expected a JSON object")
+    for field, field_type in REQUIRED_EVENT_FIELDS:
+        value = event.get(field)
+        if not value:
+            raise ValueError(f"Invalid event: missing '{field}' field")
+        if not isinstance(value, field_type):
+            raise ValueError(f"Invalid event: '{field}' must be of type {field_type.__name__}")
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize an event or result for debug logging, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, default=str)
+
+
+def _dig(obj: Any, *path: Any) -> Any:
+    """
+    Walk nested dicts/lists along path, returning None on any missing step
+    
+    Args:
+        obj: Root object (typically part of a CloudTrail event)
+        *path: Dict keys and list indexes to follow
+        
+    Returns:
+        Value at the end of the path, or None
+    """
+    for step in path:
+        if isinstance(obj, dict):
+            obj = obj.get(step)
+        elif isinstance(obj, list) and isinstance(step, int) and -len(obj) <= step < len(obj):
+            obj = obj[step]
+        else:
+            return None
+        if obj is None:
+            return None
+    return obj
 
 
 class EventValidator:
     """Validates EventBridge events from multiple accounts and maps them to Cloud Custodian policies"""
     
+    # EventBridge detail-type -> validator method
+    EVENT_VALIDATORS = {
+        CLOUDTRAIL_DETAIL_TYPE: '_validate_cloudtrail_event',
+        SECURITYHUB_DETAIL_TYPE: '_validate_securityhub_event',
+        GUARDDUTY_DETAIL_TYPE: '_validate_guardduty_event',
+    }
+    
+    # CloudTrail event source -> (event_info field, extractor method) pairs
+    RESOURCE_EXTRACTORS = {
+        's3.amazonaws.com': (
+            ('bucket_name', '_extract_bucket_name'),
+        ),
+        'ec2.amazonaws.com': (
+            ('instance_id', '_extract_instance_id'),
+            ('group_id', '_extract_security_group_id'),
+        ),
+        'iam.amazonaws.com': (
+            ('username', '_extract_username'),
+        ),
+        # ALB/ELB resource identifiers
+        'elasticloadbalancing.amazonaws.com': (
+            ('load_balancer_arn', '_extract_load_balancer_arn'),
+            ('listener_arn', '_extract_listener_arn'),
+        ),
+    }
+    
     def __init__(self, policy_mapping: Dict[str, Any]):
         """
         Initialize the validator with policy mapping configuration
@@ -30,8 +152,24 @@ class EventValidator:
         self.account_mapping = policy_mapping.get('account_mapping', {})
         self.default_policy = policy_mapping.get('default_policy', {})
         
-        logger.info(f"EventValidator initialized with {len(self.event_mapping)} event types")
-        logger.info(f"Account mapping configured for {len(self.account_mapping)} accounts")
+        # Bind the resource extractors once so each event does a single dict lookup
+        self._source_extractors = {
+            event_source: tuple((field_name, getattr(self, extractor_name))
+                                for field_name, extractor_name in extractors)
+            for event_source, extractors in self.RESOURCE_EXTRACTORS.items()
+        }
+        
+        # Policy file location is fixed for the container
+        self.s3_bucket = os.environ.get('POLICY_BUCKET')
+        self.s3_prefix = os.environ.get('POLICY_PREFIX', 'policies/')
+        self._s3_prefix_norm = f"{self.s3_prefix.rstrip('/')}/" if self.s3_prefix else ''
+        
+        logger.info("EventValidator initialized with %d event types", len(self.event_mapping))
+        logger.info("Account mapping configured for %d accounts", len(self.account_mapping))
+    
+    def _build_s3_key(self, source_file: str) -> str:
+        """Construct the S3 key of a policy file under the policy prefix"""
+        return f"{self._s3_prefix_norm}{source_file.lstrip('/')}"
     
     def validate_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -46,41 +184,35 @@ class EventValidator:
         Raises:
             ValueError: If event is invalid or missing required fields
         """
-        logger.info(f"Validating cross-account event: {json.dumps(event, default=str)}")
-        
-        # Check if it's an EventBridge event
-        if 'detail-type' not in event:
-            raise ValueError("Invalid event: missing 'detail-type' field")
+        # Reject malformed and unsupported events before serializing them for the log
+        check_event_shape(event)
+        return self._validate_checked_event(event)
+    
+    def _validate_checked_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """validate_event for an event that already passed check_event_shape"""
+        detail_type = event['detail-type']
+        validator_name = self.EVENT_VALIDATORS.get(detail_type)
+        if validator_name is None:
+            raise ValueError(f"Unsupported event type: {detail_type}")
         
-        detail_type = event.get('detail-type', '')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Validating cross-account event: %s", _dumps(event))
         
         # Extract source account ID
         source_account = event.get('account')
         if source_account:
-            logger.info(f"Event from account: {source_account}")
+            logger.info("Event from account: %s", source_account)
         
         # Handle different event types
-        if detail_type == 'AWS API Call via CloudTrail':
-            # CloudTrail event processing
-            return self._validate_cloudtrail_event(event)
-        elif detail_type == 'Security Hub Findings - Imported':
-            # Security Hub event processing
-            return self._validate_securityhub_event(event)
-        elif detail_type == 'GuardDuty Finding':
-            # GuardDuty event processing
-            return self._validate_guardduty_event(event)
-        else:
-            raise ValueError(f"Unsupported event type: {detail_type}")
+        return getattr(self, validator_name)(event)
     
     def _validate_cloudtrail_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Validate CloudTrail API call events (cross-account aware)"""
-        # Extract event details
-        detail = event.get('detail', {})
-        if not detail:
-            raise ValueError("Invalid event: missing 'detail' field")
+        # Extract event details (presence and type checked by check_event_shape)
+        detail = event['detail']
         
         # Extract userIdentity first (needed for both account and creator)
-        user_identity = detail.get('userIdentity', {})
+        user_identity = detail.get('userIdentity') or {}
         
         # Extract source account
         source_account = event.get('account')
@@ -107,9 +239,10 @@ class EventValidator:
             'source_account': source_account,  # Cross-account context
             'source_ip': detail.get('sourceIPAddress', ''),
             'user_agent': detail.get('userAgent', ''),
-            'request_parameters': detail.get('requestParameters', {}),
-            'response_elements': detail.get('responseElements', {}),
-            'user_identity': detail.get('userIdentity', {}),
+            # CloudTrail sends null for empty parameters - normalize to dicts once here
+            'request_parameters': detail.get('requestParameters') or {},
+            'response_elements': detail.get('responseElements') or {},
+            'user_identity': user_identity,
             'creator_name': creator_name,  # User who performed the action
             'raw_event': event,  # Include the complete raw event for policy context
         }
@@ -117,69 +250,21 @@ class EventValidator:
         # Validate event source
         event_source = event_info['event_source']
         
-        # Support multiple AWS services
-        supported_sources = [
-            's3.amazonaws.com',
-            'ec2.amazonaws.com',
-            'iam.amazonaws.com',
-            'securityhub.amazonaws.com',
-            'guardduty.amazonaws.com',
-            'macie.amazonaws.com',
-            'config.amazonaws.com',
-            'lambda.amazonaws.com',
-            'rds.amazonaws.com',
-            'dynamodb.amazonaws.com',
-            'cloudfront.amazonaws.com',
-            'elasticloadbalancing.amazonaws.com',
-            'cloudtrail.amazonaws.com',
-            'cloudwatch.amazonaws.com',
-            'autoscaling.amazonaws.com',
-            'sns.amazonaws.com',
-            'sqs.amazonaws.com',
-            'kms.amazonaws.com',
-            'logs.amazonaws.com',
-            'events.amazonaws.com',
-            'redshift.amazonaws.com',
-            'efs.amazonaws.com',
-            'eks.amazonaws.com',
-            'codecommit.amazonaws.com',
-            'secretsmanager.amazonaws.com',
-            'ssm.amazonaws.com'
-        ]
-        
-        if event_source not in supported_sources:
-            logger.warning(f"Event source {event_source} not in typical supported list, proceeding anyway")
+        if event_source not in SUPPORTED_EVENT_SOURCES:
+            logger.warning("Event source %s not in typical supported list, proceeding anyway", event_source)
         
         # Extract resource identifiers based on service
-        if event_source == 's3.amazonaws.com':
-            bucket_name = self._extract_bucket_name(event_info)
-            event_info['bucket_name'] = bucket_name
-        elif event_source == 'ec2.amazonaws.com':
-            instance_id = self._extract_instance_id(event_info)
-            if instance_id:
-                event_info['instance_id'] = instance_id
-            group_id = self._extract_security_group_id(event_info)
-            if group_id:
-                event_info['group_id'] = group_id
-        elif event_source == 'iam.amazonaws.com':
-            username = self._extract_username(event_info)
-            if username:
-                event_info['username'] = username
-        elif event_source == 'elasticloadbalancing.amazonaws.com':
-            # Extract ALB/ELB resource identifiers
-            load_balancer_arn = self._extract_load_balancer_arn(event_info)
-            if load_balancer_arn:
-                event_info['load_balancer_arn'] = load_balancer_arn
-            listener_arn = self._extract_listener_arn(event_info)
-            if listener_arn:
-                event_info['listener_arn'] = listener_arn
+        for field_name, extractor in self._source_extractors.get(event_source, ()):
+            value = extractor(event_info)
+            if value:
+                event_info[field_name] = value
         
         # Generic resource extraction for ALL AWS services
         generic_resources = self._extract_generic_resources(event_info)
         if generic_resources:
             event_info['generic_resources'] = generic_resources
         
-        logger.info(f"Event validated from account {source_account}: {event_info['event_name']}")
+        logger.info("Event validated from account %s: %s", source_account, event_info['event_name'])
         
         return {
             'valid': True,
@@ -188,10 +273,8 @@ class EventValidator:
     
     def _validate_securityhub_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Validate Security Hub Findings events (cross-account aware)"""
-        # Extract event details
-        detail = event.get('detail', {})
-        if not detail:
-            raise ValueError("Invalid event: missing 'detail' field")
+        # Extract event details (presence and type checked by check_event_shape)
+        detail = event['detail']
         
         # Extract source account
         source_account = event.get('account')
@@ -202,7 +285,7 @@ class EventValidator:
                 source_account = findings[0].get('AwsAccountId')
         
         # Security Hub events use 'detail-type' as the event name
-        detail_type = event.get('detail-type', '')
+        detail_type = event['detail-type']
         
         # Extract key information
         event_info = {
@@ -219,7 +302,7 @@ class EventValidator:
             'raw_event': event,  # Include the complete raw event for policy context
         }
         
-        logger.info(f"Security Hub event validated from account {source_account}: {event_info['event_name']}")
+        logger.info("Security Hub event validated from account %s: %s", source_account, event_info['event_name'])
         
         return {
             'valid': True,
@@ -228,10 +311,8 @@ class EventValidator:
     
     def _validate_guardduty_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Validate GuardDuty Finding events (cross-account aware)"""
-        # Extract event details
-        detail = event.get('detail', {})
-        if not detail:
-            raise ValueError("Invalid event: missing 'detail' field")
+        # Extract event details (presence and type checked by check_event_shape)
+        detail = event['detail']
         
         # Extract source account
         source_account = event.get('account')
@@ -240,7 +321,7 @@ class EventValidator:
             source_account = detail.get('accountId')
         
         # GuardDuty events use 'detail-type' as the event name
-        detail_type = event.get('detail-type', '')
+        detail_type = event['detail-type']
         
         # Extract finding details
         finding_type = detail.get('type', '')
@@ -265,7 +346,7 @@ class EventValidator:
             'finding_id': finding_id  # GuardDuty finding ID
         }
         
-        logger.info(f"GuardDuty event validated from account {source_account}: {finding_type} (severity: {severity})")
+        logger.info("GuardDuty event validated from account %s: %s (severity: %s)", source_account, finding_type, severity)
         
         return {
             'valid': True,
@@ -274,125 +355,52 @@ class EventValidator:
     
     def _extract_bucket_name(self, event_info: Dict[str, Any]) -> str:
         """Extract bucket name from event information"""
-        request_params = event_info.get('request_parameters', {})
+        request_params = event_info['request_parameters']
         
-        # Method 1: bucketName in request parameters
-        bucket_name = request_params.get('bucketName')
+        # Try bucketName, then bucket in request parameters, then response elements
+        bucket_name = (request_params.get('bucketName')
+                       or request_params.get('bucket')
+                       or event_info['response_elements'].get('bucketName'))
         if bucket_name:
             return bucket_name
         
-        # Method 2: bucket in request parameters
-        bucket_name = request_params.get('bucket')
-        if bucket_name:
-            return bucket_name
-        
-        # Method 3: Extract from response elements
-        response_elements = event_info.get('response_elements', {})
-        if isinstance(response_elements, dict):
-            bucket_name = response_elements.get('bucketName')
-            if bucket_name:
-                return bucket_name
-        
         raise ValueError("Could not extract bucket name from event")
     
     def _extract_instance_id(self, event_info: Dict[str, Any]) -> Optional[str]:
         """Extract EC2 instance ID from event information"""
-        request_params = event_info.get('request_parameters', {})
-        response_elements = event_info.get('response_elements', {})
+        request_params = event_info['request_parameters']
         
-        # Try response elements first (for RunInstances)
-        if isinstance(response_elements, dict):
-            instances_set = response_elements.get('instancesSet', {})
-            if isinstance(instances_set, dict):
-                items = instances_set.get('items', [])
-                if items and len(items) > 0:
-                    return items[0].get('instanceId')
-        
-        # Try request parameters
-        instance_id = request_params.get('instanceId')
-        if instance_id:
-            return instance_id
-        
-        # Try instancesSet in request
-        instances_set = request_params.get('instancesSet', {})
-        if isinstance(instances_set, dict):
-            items = instances_set.get('items', [])
-            if items and len(items) > 0:
-                return items[0].get('instanceId')
-        
-        return None
+        # Try response elements first (for RunInstances), then request parameters
+        return (_dig(event_info['response_elements'], 'instancesSet', 'items', 0, 'instanceId')
+                or request_params.get('instanceId')
+                or _dig(request_params, 'instancesSet', 'items', 0, 'instanceId'))
     
     def _extract_security_group_id(self, event_info: Dict[str, Any]) -> Optional[str]:
         """Extract security group ID from event information"""
-        request_params = event_info.get('request_parameters', {})
-        response_elements = event_info.get('response_elements', {})
-        
-        # Try request parameters
-        group_id = request_params.get('groupId')
-        if group_id:
-            return group_id
-        
-        # Try response elements (for CreateSecurityGroup)
-        if isinstance(response_elements, dict):
-            group_id = response_elements.get('groupId')
-            if group_id:
-                return group_id
-        
-        return None
+        # Try request parameters, then response elements (for CreateSecurityGroup)
+        return (event_info['request_parameters'].get('groupId')
+                or event_info['response_elements'].get('groupId'))
     
     def _extract_username(self, event_info: Dict[str, Any]) -> Optional[str]:
         """Extract IAM username from event information"""
-        request_params = event_info.get('request_parameters', {})
+        request_params = event_info['request_parameters']
         
-        # Try userName in request parameters
-        username = request_params.get('userName')
-        if username:
-            return username
-        
-        # Try user in request parameters
-        username = request_params.get('user')
-        if username:
-            return username
-        
-        return None
+        # Try userName, then user in request parameters
+        return request_params.get('userName') or request_params.get('user')
     
     def _extract_load_balancer_arn(self, event_info: Dict[str, Any]) -> Optional[str]:
         """Extract ALB/ELB load balancer ARN from event information"""
-        response_elements = event_info.get('response_elements', {})
-        request_params = event_info.get('request_parameters', {})
-        
-        # Try response elements first (for CreateLoadBalancer, ModifyLoadBalancerAttributes)
-        if isinstance(response_elements, dict):
-            # CreateLoadBalancer response
-            load_balancers = response_elements.get('loadBalancers', [])
-            if load_balancers and len(load_balancers) > 0:
-                return load_balancers[0].get('loadBalancerArn')
-        
-        # Try request parameters (for ModifyLoadBalancerAttributes, DeleteLoadBalancer)
-        load_balancer_arn = request_params.get('loadBalancerArn')
-        if load_balancer_arn:
-            return load_balancer_arn
-        
-        return None
+        # Try response elements first (for CreateLoadBalancer), then request
+        # parameters (for ModifyLoadBalancerAttributes, DeleteLoadBalancer)
+        return (_dig(event_info['response_elements'], 'loadBalancers', 0, 'loadBalancerArn')
+                or event_info['request_parameters'].get('loadBalancerArn'))
     
     def _extract_listener_arn(self, event_info: Dict[str, Any]) -> Optional[str]:
         """Extract ALB/ELB listener ARN from event information"""
-        response_elements = event_info.get('response_elements', {})
-        request_params = event_info.get('request_parameters', {})
-        
-        # Try response elements first (for CreateListener)
-        if isinstance(response_elements, dict):
-            # CreateListener response
-            listeners = response_elements.get('listeners', [])
-            if listeners and len(listeners) > 0:
-                return listeners[0].get('listenerArn')
-        
-        # Try request parameters (for ModifyListener, DeleteListener)
-        listener_arn = request_params.get('listenerArn')
-        if listener_arn:
-            return listener_arn
-        
-        return None
+        # Try response elements first (for CreateListener), then request
+        # parameters (for ModifyListener, DeleteListener)
+        return (_dig(event_info['response_elements'], 'listeners', 0, 'listenerArn')
+                or event_info['request_parameters'].get('listenerArn'))
     
     def get_policy_mappings_for_account(
         self,
@@ -411,7 +419,7 @@ class EventValidator:
         """
         event_name = event_info.get('event_name', '')
         
-        logger.info(f"Looking up policy mappings for event: {event_name} in account: {account_id}")
+        logger.info("Looking up policy mappings for event: %s in account: %s", event_name, account_id)
         
         # Check if account has custom policy mapping
         account_config = self.account_mapping.get(account_id, {})
@@ -420,17 +428,17 @@ class EventValidator:
         if account_config and 'event_mapping' in account_config:
             policies = account_config['event_mapping'].get(event_name, [])
             if policies:
-                logger.info(f"Using account-specific policies for {account_id}: {len(policies)} policies")
+                logger.info("Using account-specific policies for %s: %s policies", account_id, len(policies))
                 return policies
         
         # Fallback to global event mapping
         policies = self.event_mapping.get(event_name, [])
         
         if not policies:
-            logger.warning(f"No policies found for event {event_name} in account {account_id}")
+            logger.warning("No policies found for event %s in account %s", event_name, account_id)
             return []
         
-        logger.info(f"Found {len(policies)} policies for event {event_name}")
+        logger.info("Found %s policies for event %s", len(policies), event_name)
         
         return policies
     
@@ -445,79 +453,89 @@ class EventValidator:
             List of policy mapping configurations for this event type
         """
         event_name = event_info.get('event_name', '')
-        logger.info(f"Looking up policy mappings for event: {event_name}")
+        logger.info("Looking up policy mappings for event: %s", event_name)
         
         policies = self.event_mapping.get(event_name, [])
         
         if not policies:
-            logger.warning(f"No policies found for event {event_name}")
+            logger.warning("No policies found for event %s", event_name)
             return []
         
-        logger.info(f"Found {len(policies)} policies for event {event_name}")
+        logger.info("Found %s policies for event %s", len(policies), event_name)
         return policies
     
-    def get_policy_details(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def _build_policy_configs(
+        self,
+        event_info: Dict[str, Any],
+        source_account: Optional[str]
+    ) -> List[Dict[str, Any]]:
         """
-        Validate event and return policy execution details for all mapped policies (cross-account aware)
+        Build the execution configs of all policies mapped to an event
         
         Args:
-            event: EventBridge event
+            event_info: Validated event information
+            source_account: AWS account ID the event came from (None for global mapping)
             
         Returns:
-            Dictionary containing event info and list of policies to execute
-            
-        Raises:
-            ValueError: If event is invalid or no policy mapping found
+            List of policy configs to execute
         """
-        # Validate event
-        validation_result = self.validate_event(event)
-        event_info = validation_result['event_info']
-        
-        # Extract source account
-        source_account = event_info.get('source_account')
-        if not source_account:
-            logger.warning("No source account found in event, using global policy mapping")
-        
         # Get policy mappings for this account and event
         if source_account:
             policy_mappings = self.get_policy_mappings_for_account(event_info, source_account)
         else:
             policy_mappings = self.get_policy_mappings(event_info)
         
-        if not policy_mappings:
-            raise ValueError(f"No policies found for event {event_info['event_name']}")
-        
-        # Extract S3 configuration from environment variables
-        s3_bucket = os.environ.get('POLICY_BUCKET')
-        s3_prefix = os.environ.get('POLICY_PREFIX', 'policies/')
-        
-        if not s3_bucket:
-            raise ValueError("POLICY_BUCKET environment variable not set")
-        
-        # Build policy configs for all mapped policies
         policies_to_execute = []
         for policy_mapping in policy_mappings:
             source_file = policy_mapping.get('source_file')
             policy_name = policy_mapping.get('policy_name')
             
             if not source_file or not policy_name:
-                logger.warning(f"Skipping invalid policy mapping: {policy_mapping}")
+                logger.warning("Skipping invalid policy mapping: %s", policy_mapping)
                 continue
             
-            # Construct S3 key
-            s3_key = f"{s3_prefix}{source_file}".replace('//', '/')
-            
             policies_to_execute.append({
-                's3_bucket': s3_bucket,
-                's3_key': s3_key,
+                's3_bucket': self.s3_bucket,
+                's3_key': self._build_s3_key(source_file),
                 'source_file': source_file,
                 'policy_name': policy_name,
                 'resource': policy_mapping.get('resource', ''),
                 'mode_type': policy_mapping.get('mode_type', 'cloudtrail'),
                 'target_account': source_account  # Cross-account context
             })
+        return policies_to_execute
+    
+    def get_policy_details(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate event and return policy execution details for all mapped policies (cross-account aware)
         
-        logger.info(f"Prepared {len(policies_to_execute)} policies for execution in account {source_account}")
+        Args:
+            event: EventBridge event
+            
+        Returns:
+            Dictionary containing event info and list of policies to execute
+            
+        Raises:
+            ValueError: If event is invalid or no policy mapping found
+        """
+        # Validate event
+        validation_result = self.validate_event(event)
+        event_info = validation_result['event_info']
+        
+        # Extract source account
+        source_account = event_info.get('source_account')
+        if not source_account:
+            logger.warning("No source account found in event, using global policy mapping")
+        
+        policies_to_execute = self._build_policy_configs(event_info, source_account)
+        if not policies_to_execute:
+            raise ValueError(f"No policies found for event {event_info['event_name']}")
+        
+        # S3 configuration was read from environment variables at init
+        if not self.s3_bucket:
+            raise ValueError("POLICY_BUCKET environment variable not set")
+        
+        logger.info("Prepared %s policies for execution in account %s", len(policies_to_execute), source_account)
         
         result = {
             'event_info': event_info,
@@ -526,7 +544,8 @@ class EventValidator:
             'target_region': event_info.get('aws_region', 'us-east-1')
         }
         
-        logger.info(f"Policy details: {json.dumps(result, default=str)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Policy details: %s", _dumps(result))
         
         return result
 
@@ -559,7 +578,8 @@ class EventValidator:
         resources['ids'] = list(set(resources['ids']))
         resources['names'] = list(set(resources['names']))
         
-        logger.info(f"Generic extraction found: {len(resources['arns'])} ARNs, {len(resources['ids'])} IDs, {len(resources['names'])} names")
+        logger.info("Generic extraction found: %s ARNs, %s IDs, %s names",
+                    len(resources['arns']), len(resources['ids']), len(resources['names']))
         
         return resources
     
@@ -599,7 +619,7 @@ class EventValidator:
                     if 'arn' in key_lower or (value.startswith('arn:aws:') if value else False):
                         if value and value not in resources['arns']:
                             resources['arns'].append(value)
-                            logger.debug(f"Found ARN in field '{key}': {value}")
+                            logger.debug("Found ARN in field '%s': %s", key, value)
                     
                     # ID detection (common patterns)
                     elif any(pattern in key_lower for pattern in [
@@ -610,7 +630,7 @@ class EventValidator:
                     ]):
                         if value and value not in resources['ids']:
                             resources['ids'].append(value)
-                            logger.debug(f"Found ID in field '{key}': {value}")
+                            logger.debug("Found ID in field '%s': %s", key, value)
                     
                     # Name detection
                     elif any(pattern in key_lower for pattern in [
@@ -619,7 +639,7 @@ class EventValidator:
                     ]):
                         if value and value not in resources['names']:
                             resources['names'].append(value)
-                            logger.debug(f"Found name in field '{key}': {value}")
+                            logger.debug("Found name in field '%s': %s", key, value)
                 
                 # Recurse into nested structures
                 self._recursive_extract(value, resources, depth + 1, max_depth)
@@ -629,12 +649,26 @@ class EventValidator:
                 self._recursive_extract(item, resources, depth + 1, max_depth)
 
 
+# Mapping-free validator shared by the legacy function (built on first use)
+_default_validator = None
+
+
 # Legacy functions for backward compatibility
-def validate_event(event: Dict[str, Any]) -> Dict[str, Any]:
-    """Legacy validate_event function for backward compatibility"""
+def validate_event(event: Dict[str, Any], shape_checked: bool = False) -> Dict[str, Any]:
+    """
+    Legacy validate_event function for backward compatibility
+    
+    Pass shape_checked=True when the caller already ran check_event_shape
+    (e.g. through get_event_name) so the event is not checked twice.
+    """
+    global _default_validator
     try:
-        validator = EventValidator({'event_mapping': {}})
-        result = validator.validate_event(event)
+        if _default_validator is None:
+            _default_validator = EventValidator({'event_mapping': {}})
+        if shape_checked:
+            result = _default_validator._validate_checked_event(event)
+        else:
+            result = _default_validator.validate_event(event)
         return {
             'valid': result['valid'],
             'event_info': result.get('event_info', {})
@@ -644,3 +678,25 @@ def validate_event(event: Dict[str, Any]) -> Dict[str, Any]:
             'valid': False,
             'error': str(e)
         }
+
+
+def get_event_name(event: Dict[str, Any]) -> str:
+    """
+    Resolve the policy-mapping key of an event without running full validation
+    
+    Args:
+        event: EventBridge event payload
+        
+    Returns:
+        CloudTrail eventName, or the detail-type for Security Hub/GuardDuty findings
+        
+    Raises:
+        ValueError: If the event shape is invalid or the detail-type is unsupported
+    """
+    check_event_shape(event)
+    detail_type = event['detail-type']
+    if detail_type == CLOUDTRAIL_DETAIL_TYPE:
+        return event['detail'].get('eventName', '')
+    if detail_type not in EventValidator.EVENT_VALIDATORS:
+        raise ValueError(f"Unsupported event type: {detail_type}")
+    return detail_type
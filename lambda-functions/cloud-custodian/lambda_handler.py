@@ -7,30 +7,51 @@ and executing Cloud Custodian policies with cross-account role assumption.
 Also handles real-time SQS message processing with custom formatting for instant notifications.
 """
 
+import copy
 import json
 import logging
 import os
 import boto3
-from typing import Dict, Any
+import yaml
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from typing import Callable, Dict, Any, Optional
 from cross_account_executor import (
     CrossAccountExecutor,
     extract_account_from_event,
     extract_region_from_event
 )
-from event_validator import validate_event
+from event_validator import validate_event, get_event_name
 from realtime_notifier import process_realtime_sqs_messages
 
-# Configure logging
+# Configure logging - the root level is set once here; other modules log
+# through getLogger(__name__) and inherit it
 logger = logging.getLogger()
 logger.setLevel(os.getenv('LOG_LEVEL', 'INFO'))
 
+# Optional import - fall back to stdlib json if orjson is not in the layer
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Use the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
 # Optional import - graceful degradation if not deployed yet
 try:
     from compliance_pre_validator import ResourceValidator
     RESOURCE_VALIDATOR_AVAILABLE = True
+    # Stateless, so one instance is shared across warm invocations
+    RESOURCE_VALIDATOR = ResourceValidator()
 except ImportError:
     logger.warning("ResourceValidator module not available - pre-validation disabled")
     ResourceValidator = None
+    RESOURCE_VALIDATOR = None
     RESOURCE_VALIDATOR_AVAILABLE = False
 
 # Note: Cloud Custodian logger configuration is done in cross_account_executor.py
@@ -39,6 +60,169 @@ except ImportError:
 # Environment variables
 POLICY_BUCKET = os.getenv('POLICY_BUCKET')
 ACCOUNT_MAPPING_KEY = os.getenv('ACCOUNT_MAPPING_KEY', 'config/account-policy-mapping.json')
+# Policies run concurrently only when raised above 1 (c7n run logs interleave between threads)
+MAX_POLICY_WORKERS = int(os.getenv('MAX_POLICY_WORKERS', '1'))
+# Fan policies out to async child invocations above this count (0 disables fan-out)
+FANOUT_THRESHOLD = int(os.getenv('FANOUT_THRESHOLD', '0'))
+# Lambda rejects asynchronous invocation payloads above 256 KB
+ASYNC_INVOKE_PAYLOAD_LIMIT = 256 * 1024
+
+# boto3 sessions keyed by region so credentials are resolved once per container
+_sessions: Dict[Optional[str], boto3.Session] = {}
+
+# Central (Lambda's own) account ID, resolved once per container
+_central_account_id = None
+
+# S3 client reused across warm invocations (created on first use)
+S3_CLIENT_CONFIG = Config(retries={'max_attempts': 2, 'mode': 'standard'}, tcp_keepalive=True)
+_s3_client = None
+
+# Lambda client for policy fan-out (created on first use)
+_lambda_client = None
+
+# Policy worker pool kept across warm invocations so per-thread boto3 sessions are reused
+_policy_pool: Optional[ThreadPoolExecutor] = None
+
+# Event index built from the current account mapping: (mapping, {(account_id, event_name): {file: [policy_names]}})
+_policy_index = None
+
+# Parsed S3 objects (account mapping, policy files) cached across warm invocations:
+# (bucket, key) -> (etag, parsed)
+_s3_object_cache: Dict[tuple, tuple] = {}
+
+
+def get_session(region: Optional[str] = None) -> boto3.Session:
+    """
+    Get the shared boto3 session for a region, creating it on first use
+    
+    Args:
+        region: AWS region name (None uses the Lambda's default region)
+        
+    Returns:
+        boto3 Session with the Lambda's own credentials
+    """
+    session = _sessions.get(region)
+    if session is None:
+        session = _sessions[region] = boto3.Session(region_name=region)
+    return session
+
+
+def get_central_account_id() -> str:
+    """
+    Get the Lambda's own account ID, calling STS only on first use
+    
+    Returns:
+        Central account ID
+    """
+    global _central_account_id
+    if _central_account_id is None:
+        _central_account_id = get_session().client('sts').get_caller_identity()['Account']
+    return _central_account_id
+
+
+def get_s3_client():
+    """
+    Get the shared S3 client, creating it on first use
+    
+    Returns:
+        boto3 S3 client
+    """
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = get_session().client('s3', config=S3_CLIENT_CONFIG)
+    return _s3_client
+
+
+def get_policy_pool() -> ThreadPoolExecutor:
+    """
+    Get the shared policy worker pool, creating it on first use
+    
+    Returns:
+        ThreadPoolExecutor with MAX_POLICY_WORKERS threads
+    """
+    global _policy_pool
+    if _policy_pool is None:
+        _policy_pool = ThreadPoolExecutor(max_workers=max(MAX_POLICY_WORKERS, 1),
+                                          thread_name_prefix='policy')
+    return _policy_pool
+
+
+def get_lambda_client():
+    """
+    Get the shared Lambda client, creating it on first use
+    
+    Returns:
+        boto3 Lambda client
+    """
+    global _lambda_client
+    if _lambda_client is None:
+        _lambda_client = get_session().client('lambda')
+    return _lambda_client
+
+
+def dumps(obj: Any) -> str:
+    """
+    Serialize to a JSON string, using orjson when available
+    
+    Args:
+        obj: Object to serialize (non-JSON types are converted with str)
+        
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, default=str)
+
+
+def loads(data: bytes) -> Any:
+    """
+    Parse a JSON document, using orjson when available
+    
+    Args:
+        data: Raw JSON bytes
+        
+    Returns:
+        Parsed object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+
+def get_cached_s3_object(key: str, parse: Callable[[Any], Any]) -> Any:
+    """
+    Fetch and parse an object from the policy bucket, reusing the cached copy
+    
+    The parsed object is cached across warm invocations and revalidated with
+    a conditional GET on its ETag, so an unchanged object is not downloaded
+    or parsed again.
+    
+    Args:
+        key: S3 object key in POLICY_BUCKET
+        parse: Callable that parses the GetObject response (its 'Body' is a stream)
+        
+    Returns:
+        Parsed object
+    """
+    cache_key = (POLICY_BUCKET, key)
+    cached = _s3_object_cache.get(cache_key)
+    
+    request = {'Bucket': POLICY_BUCKET, 'Key': key}
+    if cached:
+        request['IfNoneMatch'] = cached[0]
+    
+    try:
+        response = get_s3_client().get_object(**request)
+    except ClientError as e:
+        if cached and e.response['Error']['Code'] in ('304', 'NotModified'):
+            logger.info(f"s3://{POLICY_BUCKET}/{key} unchanged - using cached copy")
+            return cached[1]
+        raise
+    
+    parsed = parse(response)
+    _s3_object_cache[cache_key] = (response['ETag'], parsed)
+    return parsed
 
 
 def load_account_policy_mapping() -> Dict[str, Any]:
@@ -48,17 +232,10 @@ def load_account_policy_mapping() -> Dict[str, Any]:
     Returns:
         Dict containing account policy mappings
     """
-    s3 = boto3.client('s3')
-    
     try:
         logger.info(f"Loading account policy mapping from s3://{POLICY_BUCKET}/{ACCOUNT_MAPPING_KEY}")
         
-        response = s3.get_object(
-            Bucket=POLICY_BUCKET,
-            Key=ACCOUNT_MAPPING_KEY
-        )
-        
-        mapping = json.loads(response['Body'].read().decode('utf-8'))
+        mapping = get_cached_s3_object(ACCOUNT_MAPPING_KEY, lambda response: loads(response['Body'].read()))
         logger.info(f"Loaded mapping for {len(mapping.get('account_mapping', {}))} accounts")
         
         return mapping
@@ -72,45 +249,69 @@ def load_policy_from_s3(policy_name: str) -> list:
     """
     Load Cloud Custodian policy YAML from S3
     
+    Parsed files are cached by ETag, so warm invocations pay one conditional
+    GET per file. Callers get their own copy since c7n may annotate policy
+    data in place while running.
+    
     Args:
         policy_name: Name of the policy file (without .yml extension)
         
     Returns:
         List of policy configurations from the file
     """
-    import yaml
-    
-    s3 = boto3.client('s3')
     policy_key = f"policies/{policy_name}.yml"
     
     try:
         logger.info(f"Loading policy from s3://{POLICY_BUCKET}/{policy_key}")
         
-        response = s3.get_object(
-            Bucket=POLICY_BUCKET,
-            Key=policy_key
+        # Parse straight from the streaming body instead of buffering and decoding first
+        policy_config = get_cached_s3_object(
+            policy_key,
+            lambda response: yaml.load(response['Body'], Loader=YamlSafeLoader)
         )
         
-        policy_yaml = response['Body'].read().decode('utf-8')
-        policy_config = yaml.safe_load(policy_yaml)
-        
         # Return all policies from the file
         if 'policies' in policy_config:
-            return policy_config['policies']
+            return copy.deepcopy(policy_config['policies'])
         
         # If single policy format, wrap in list
-        return [policy_config]
+        return [copy.deepcopy(policy_config)]
         
     except Exception as e:
         logger.error(f"Failed to load policy {policy_name}: {str(e)}")
         raise
 
 
+def build_policy_index(policy_mapping: Dict[str, Any]) -> Dict[tuple, dict]:
+    """
+    Index account event mappings by (account_id, event_name)
+    
+    Args:
+        policy_mapping: Complete policy mapping configuration
+        
+    Returns:
+        Dict mapping (account_id, event_name) to {file_name: [policy_names]}
+    """
+    index = {}
+    for account_id, account_config in policy_mapping.get('account_mapping', {}).items():
+        for event_name, policy_configs in account_config.get('event_mapping', {}).items():
+            # Group by source file
+            policies_by_file = {}
+            for policy_config in policy_configs:
+                file_name = policy_config['source_file'].replace('.yml', '')
+                policies_by_file.setdefault(file_name, []).append(policy_config['policy_name'])
+            index[(account_id, event_name)] = policies_by_file
+    return index
+
+
 def get_policies_for_event(account_id: str, event_name: str, policy_mapping: Dict[str, Any]) -> dict:
     """
     Get policies to execute for a given account and event
     Only checks account-specific event mappings - all policies must be explicitly mapped to events
     
+    The (account, event) index is built once per loaded mapping, so warm
+    invocations do a single dict lookup instead of regrouping the mapping.
+    
     Args:
         account_id: AWS account ID where event occurred
         event_name: Name of the event (e.g., 'RunInstances')
@@ -120,8 +321,9 @@ def get_policies_for_event(account_id: str, event_name: str, policy_mapping: Dic
         Dict mapping source files to list of policy names to execute
         Example: {'aws-ec2-security': ['ec2-stop-instances-on-launch']}
     """
-    # Result will always be a dict: file_name -> [policy_names]
-    policies_by_file = {}
+    global _policy_index
+    if _policy_index is None or _policy_index[0] is not policy_mapping:
+        _policy_index = (policy_mapping, build_policy_index(policy_mapping))
     
     # Check account-specific policies
     account_mapping = policy_mapping.get('account_mapping', {})
@@ -130,29 +332,196 @@ def get_policies_for_event(account_id: str, event_name: str, policy_mapping: Dic
         logger.info(f"Account {account_id} not found in policy mapping")
         return {}
     
-    account_config = account_mapping[account_id]
-    account_name = account_config.get('name', account_id)
-    
-    # Check for account-specific event mapping
-    account_event_mapping = account_config.get('event_mapping', {})
-    
-    if event_name in account_event_mapping:
-        policy_configs = account_event_mapping[event_name]
-        # Group by source file
-        for policy_config in policy_configs:
-            file_name = policy_config['source_file'].replace('.yml', '')
-            policy_name = policy_config['policy_name']
-            if file_name not in policies_by_file:
-                policies_by_file[file_name] = []
-            policies_by_file[file_name].append(policy_name)
-        
-        logger.info(f"Found {len(policy_configs)} policy(ies) for event '{event_name}' in account {account_name}: {policies_by_file}")
+    policies_by_file = _policy_index[1].get((account_id, event_name))
+    if policies_by_file is not None:
+        account_name = account_mapping[account_id].get('name', account_id)
+        policy_count = sum(len(names) for names in policies_by_file.values())
+        logger.info(f"Found {policy_count} policy(ies) for event '{event_name}' in account {account_name}: {policies_by_file}")
         return policies_by_file
     
     logger.info(f"No policies configured for event '{event_name}' in account {account_id}")
     return {}
 
 
+def create_executor(account_id: str, region: str, environment: str) -> CrossAccountExecutor:
+    """
+    Create a CrossAccountExecutor with a session for the target account
+    
+    Uses the Lambda's default session for the central account and assumes
+    the cross-account role for member accounts.
+    
+    Args:
+        account_id: AWS account ID where event occurred
+        region: AWS region for execution
+        environment: Environment name from the account mapping
+        
+    Returns:
+        CrossAccountExecutor ready to execute policies
+        
+    Raises:
+        Exception: If the cross-account role cannot be assumed
+    """
+    executor = CrossAccountExecutor(
+        account_id=account_id,
+        region=region,
+        environment=environment,
+        base_session=get_session()
+    )
+    
+    # Check if this is the central account (Lambda's own account)
+    if account_id == get_central_account_id():
+        # Event is from central account - use default session (no role assumption needed)
+        logger.info(f"Event is from central account {account_id} - using default session")
+        executor.session = get_session(region)
+    else:
+        # Event is from member account - assume cross-account role
+        assume_result = executor.assume_role()
+        logger.info(f"Successfully assumed role in member account {account_id}, session expires at {assume_result['expiration']}")
+    
+    return executor
+
+
+def fan_out_policies(context: Any, account_id: str, policies_to_run: list, event: Dict[str, Any]) -> list:
+    """
+    Invoke this function asynchronously once per policy
+    
+    Children receive only a reference to the policy (source file and name)
+    plus the original EventBridge event, and re-resolve both against the
+    account policy mapping before running anything. Policies whose payload
+    exceeds the async limit, or whose invoke fails, are returned so the
+    caller can run them locally.
+    
+    Args:
+        context: Lambda context object (provides the function name)
+        account_id: AWS account ID where event occurred
+        policies_to_run: List of (policy_file, policy_name, policy_config) tuples
+        event: Original EventBridge event
+        
+    Returns:
+        List of (policy_file, policy_name, policy_config) tuples that were not dispatched
+    """
+    lambda_client = get_lambda_client()
+    not_dispatched = []
+    for policy_file, policy_display_name, policy_config in policies_to_run:
+        payload = dumps({
+            '_child': True,
+            'account_id': account_id,
+            'source_file': policy_file,
+            'policy_name': policy_display_name,
+            'event': event
+        }).encode('utf-8')
+        
+        if len(payload) > ASYNC_INVOKE_PAYLOAD_LIMIT:
+            logger.warning(f"Child payload for policy '{policy_display_name}' is {len(payload)} bytes "
+                           f"(limit {ASYNC_INVOKE_PAYLOAD_LIMIT}) - running it locally")
+            not_dispatched.append((policy_file, policy_display_name, policy_config))
+            continue
+        
+        try:
+            lambda_client.invoke(
+                FunctionName=context.function_name,
+                InvocationType='Event',
+                Payload=payload
+            )
+        except Exception as e:
+            logger.error(f"Failed to queue child invocation for policy '{policy_display_name}': {str(e)}")
+            not_dispatched.append((policy_file, policy_display_name, policy_config))
+            continue
+        
+        logger.info(f"Queued child invocation for policy '{policy_display_name}'")
+    
+    return not_dispatched
+
+
+def handle_child_invocation(event: Dict[str, Any], invocation_id: str) -> Dict[str, Any]:
+    """
+    Execute a single policy fanned out by a parent invocation
+    
+    The payload only names the policy. It is run only if the account policy
+    mapping maps it to the event's account and event name, and its
+    definition is always loaded from the policy bucket.
+    
+    Args:
+        event: Child payload built by fan_out_policies
+        invocation_id: Lambda request ID of this invocation
+        
+    Returns:
+        Dict containing execution results
+    """
+    account_id = event.get('account_id')
+    policy_file = event.get('source_file')
+    policy_display_name = event.get('policy_name')
+    source_event = event.get('event')
+    logger.info(f"Child invocation for policy '{policy_display_name}' from {policy_file} in account {account_id}")
+    
+    try:
+        event_name = get_event_name(source_event)
+        if not account_id or account_id != extract_account_from_event(source_event):
+            raise ValueError('Child account does not match the event account')
+    except ValueError as e:
+        logger.error(f"Rejected child invocation: {str(e)}")
+        return {
+            'statusCode': 400,
+            'body': dumps({
+                'success': False,
+                'error': str(e)
+            })
+        }
+    
+    account_mapping = load_account_policy_mapping()
+    policies_by_file = get_policies_for_event(account_id, event_name, account_mapping)
+    if policy_display_name not in policies_by_file.get(policy_file, ()):
+        logger.error(f"Rejected child invocation: policy '{policy_display_name}' from {policy_file} "
+                     f"is not mapped to '{event_name}' in account {account_id}")
+        return {
+            'statusCode': 403,
+            'body': dumps({
+                'success': False,
+                'error': f"Policy '{policy_display_name}' is not mapped to this event",
+                'account_id': account_id,
+                'event_name': event_name
+            })
+        }
+    
+    try:
+        validation_result = validate_event(source_event, shape_checked=True)
+        if not validation_result['valid']:
+            raise ValueError(validation_result['error'])
+        
+        policy_config = next(
+            (p for p in load_policy_from_s3(policy_file) if p.get('name') == policy_display_name),
+            None
+        )
+        if policy_config is None:
+            raise ValueError(f"Policy '{policy_display_name}' not found in {policy_file}")
+        
+        account_info = account_mapping.get('account_mapping', {}).get(account_id, {})
+        executor = create_executor(account_id, extract_region_from_event(source_event),
+                                   account_info.get('environment', 'unknown'))
+        result = executor.execute_policy(policy_config, validation_result['event_info'])
+    except Exception as e:
+        logger.error(f"Failed to execute policy '{policy_display_name}': {str(e)}", exc_info=True)
+        result = {
+            'policy_name': policy_display_name,
+            'success': False,
+            'error': str(e)
+        }
+    
+    sqs_stats = {'processed': 0, 'published': 0}
+    if result.get('success'):
+        sqs_stats = process_realtime_sqs_messages(invocation_id=invocation_id)
+    
+    return {
+        'statusCode': 200 if result.get('success') else 500,
+        'body': dumps({
+            'success': bool(result.get('success')),
+            'account_id': account_id,
+            'realtime_notifications_sent': sqs_stats.get('published', 0),
+            'result': result
+        })
+    }
+
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Lambda handler function
@@ -172,44 +541,93 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     if invocation_id:
         os.environ['C7N_INVOCATION_ID'] = invocation_id
     
-    logger.info(f"Received event: {json.dumps(event, default=str)}")
+    # Reject non-object payloads before reading any fields from them
+    if not isinstance(event, dict):
+        logger.error("Event validation failed: expected a JSON object")
+        return {
+            'statusCode': 400,
+            'body': dumps({
+                'success': False,
+                'error': 'Invalid event: expected a JSON object'
+            })
+        }
+    
+    # Full event serialization only when DEBUG logging is enabled
+    logger.info("Received event id=%s source=%s detail-type=%s",
+                event.get('id'), event.get('source'), event.get('detail-type'))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Event payload: %s", dumps(event))
+    
+    # Single policy fanned out by a parent invocation
+    if event.get('_child'):
+        return handle_child_invocation(event, invocation_id)
     
     try:
-        # Validate event
-        validation_result = validate_event(event)
-        if not validation_result['valid']:
-            logger.error(f"Event validation failed: {validation_result['error']}")
+        # Resolve the mapping key cheaply; full validation only runs for mapped events
+        try:
+            event_name = get_event_name(event)
+        except ValueError as e:
+            logger.error(f"Event validation failed: {str(e)}")
             return {
                 'statusCode': 400,
-                'body': json.dumps({
+                'body': dumps({
                     'success': False,
-                    'error': validation_result['error']
+                    'error': str(e)
                 })
             }
         
-        event_info = validation_result['event_info']
-        
         # Extract account and region
         account_id = extract_account_from_event(event)
         if not account_id:
             logger.error("Could not extract account ID from event")
             return {
                 'statusCode': 400,
-                'body': json.dumps({
+                'body': dumps({
                     'success': False,
                     'error': 'Missing account ID in event'
                 })
             }
         
         region = extract_region_from_event(event)
-        event_name = event_info.get('event_name', 'Unknown')
         
         logger.info(f"Processing event '{event_name}' from account {account_id} in region {region}")
         
+        # Load account policy mapping
+        account_mapping = load_account_policy_mapping()
+        
+        # Get policies to execute
+        policies_by_file = get_policies_for_event(account_id, event_name, account_mapping)
+        
+        if not policies_by_file:
+            logger.info("No policies to execute for this event")
+            return {
+                'statusCode': 200,
+                'body': dumps({
+                    'success': True,
+                    'message': 'No policies configured for this event',
+                    'account_id': account_id,
+                    'event_name': event_name
+                })
+            }
+        
+        # Validate event (shape already checked by get_event_name)
+        validation_result = validate_event(event, shape_checked=True)
+        if not validation_result['valid']:
+            logger.error(f"Event validation failed: {validation_result['error']}")
+            return {
+                'statusCode': 400,
+                'body': dumps({
+                    'success': False,
+                    'error': validation_result['error']
+                })
+            }
+        
+        event_info = validation_result['event_info']
+        
         # ===== PRE-VALIDATION FOR LONG-RUNNING RESOURCES =====
         # Check if this event supports pre-validation (ElastiCache, EKS, Elasticsearch, Redshift)
         if RESOURCE_VALIDATOR_AVAILABLE and ResourceValidator is not None:
-            validator = ResourceValidator()
+            validator = RESOURCE_VALIDATOR
             if validator.is_supported(event_name):
                 logger.info(f"🔍 Pre-validating event '{event_name}' before Cloud Custodian execution...")
                 validation_result = validator.validate(event_name, event.get('detail', {}))
@@ -220,7 +638,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     logger.info(f"   Reason: {validation_result.get('reason')}")
                     return {
                         'statusCode': 200,
-                        'body': json.dumps({
+                        'body': dumps({
                             'success': True,
                             'message': 'Resource is compliant - Cloud Custodian execution skipped',
                             'account_id': account_id,
@@ -238,61 +656,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             logger.debug(f"Pre-validation not available for event '{event_name}'")
         # ===== END PRE-VALIDATION =====
         
-        # Load account policy mapping
-        account_mapping = load_account_policy_mapping()
-        
-        # Get policies to execute
-        policies_by_file = get_policies_for_event(account_id, event_name, account_mapping)
-        
-        if not policies_by_file:
-            logger.info("No policies to execute for this event")
-            return {
-                'statusCode': 200,
-                'body': json.dumps({
-                    'success': True,
-                    'message': 'No policies configured for this event',
-                    'account_id': account_id,
-                    'event_name': event_name
-                })
-            }
-        
-        # Initialize cross-account executor
-        # Extract environment from account mapping
-        account_info = account_mapping.get('account_mapping', {}).get(account_id, {})
-        environment = account_info.get('environment', 'unknown')
-        
-        executor = CrossAccountExecutor(
-            account_id=account_id,
-            region=region,
-            environment=environment
-        )
-        
-        # Check if this is the central account (Lambda's own account)
-        sts = boto3.client('sts')
-        central_account_id = sts.get_caller_identity()['Account']
-        
-        if account_id == central_account_id:
-            # Event is from central account - use default session (no role assumption needed)
-            logger.info(f"Event is from central account {account_id} - using default session")
-            executor.session = boto3.Session(region_name=region)
-        else:
-            # Event is from member account - assume cross-account role
-            try:
-                assume_result = executor.assume_role()
-                logger.info(f"Successfully assumed role in member account {account_id}, session expires at {assume_result['expiration']}")
-            except Exception as e:
-                logger.error(f"Failed to assume role in account {account_id}: {str(e)}")
-                return {
-                    'statusCode': 500,
-                    'body': json.dumps({
-                        'success': False,
-                        'error': f'Failed to assume role: {str(e)}',
-                        'account_id': account_id
-                    })
-                }
-        
-        # Execute each policy file
+        # Collect the mapped policies from each file
         results = []
+        policies_to_run = []
         for policy_file, policy_names_to_execute in policies_by_file.items():
             try:
                 # Load all policies from this file
@@ -309,17 +675,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                         logger.info(f"Skipping policy '{policy_display_name}' - not mapped to this event")
                         continue
                     
-                    try:
-                        result = executor.execute_policy(policy_config, event_info)
-                        results.append(result)
-                        logger.info(f"Policy '{policy_display_name}' execution completed: {result}")
-                    except Exception as e:
-                        logger.error(f"Failed to execute policy '{policy_display_name}': {str(e)}", exc_info=True)
-                        results.append({
-                            'policy_name': policy_display_name,
-                            'success': False,
-                            'error': str(e)
-                        })
+                    policies_to_run.append((policy_file, policy_display_name, policy_config))
                 
             except Exception as e:
                 logger.error(f"Failed to load policy file '{policy_file}': {str(e)}", exc_info=True)
@@ -329,6 +685,71 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'error': f"Failed to load policy file: {str(e)}"
                 })
         
+        # Extract environment from account mapping
+        account_info = account_mapping.get('account_mapping', {}).get(account_id, {})
+        environment = account_info.get('environment', 'unknown')
+        
+        # Hand large policy sets to async child invocations; any policy that could not
+        # be dispatched falls through to local execution below
+        dispatched = 0
+        if FANOUT_THRESHOLD and context and len(policies_to_run) > FANOUT_THRESHOLD:
+            not_dispatched = fan_out_policies(context, account_id, policies_to_run, event)
+            dispatched = len(policies_to_run) - len(not_dispatched)
+            logger.info(f"Fanned out {dispatched} policies to child invocations")
+            if not not_dispatched:
+                return {
+                    'statusCode': 202,
+                    'body': dumps({
+                        'success': True,
+                        'account_id': account_id,
+                        'region': region,
+                        'event_name': event_name,
+                        'policies_dispatched': dispatched,
+                        'load_failures': results
+                    })
+                }
+            logger.warning(f"Running {len(not_dispatched)} undispatched policies locally")
+            policies_to_run = not_dispatched
+        
+        # Initialize cross-account executor
+        try:
+            executor = create_executor(account_id, region, environment)
+        except Exception as e:
+            logger.error(f"Failed to assume role in account {account_id}: {str(e)}")
+            return {
+                'statusCode': 500,
+                'body': dumps({
+                    'success': False,
+                    'error': f'Failed to assume role: {str(e)}',
+                    'account_id': account_id
+                })
+            }
+        
+        # Execute policies on the shared worker pool - one at a time by default. Raising
+        # MAX_POLICY_WORKERS runs them concurrently; each worker thread keeps its own boto3
+        # session (executor.get_thread_session), but c7n's per-policy run logs attach to
+        # shared loggers and may then include lines from concurrent runs.
+        if policies_to_run:
+            pool = get_policy_pool()
+            futures = [
+                (policy_display_name, pool.submit(executor.execute_policy, policy_config, event_info))
+                for _, policy_display_name, policy_config in policies_to_run
+            ]
+            for policy_display_name, future in futures:
+                try:
+                    result = future.result()
+                    results.append(result)
+                    logger.info("Policy '%s' execution completed: success=%s",
+                                policy_display_name, result.get('success'))
+                    logger.debug("Policy '%s' result: %s", policy_display_name, result)
+                except Exception as e:
+                    logger.error(f"Failed to execute policy '{policy_display_name}': {str(e)}", exc_info=True)
+                    results.append({
+                        'policy_name': policy_display_name,
+                        'success': False,
+                        'error': str(e)
+                    })
+        
         # Summary
         successful = sum(1 for r in results if r.get('success'))
         total = len(results)
@@ -345,7 +766,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         response = {
             'statusCode': 200,
-            'body': json.dumps({
+            'body': dumps({
                 'success': True,
                 'account_id': account_id,
                 'region': region,
@@ -353,10 +774,11 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'policies_executed': total,
                 'policies_successful': successful,
                 'policies_failed': total - successful,
+                'policies_dispatched': dispatched,
                 'realtime_notifications_sent': sqs_stats.get('published', 0),
                 'sqs_messages_processed': sqs_stats.get('processed', 0),
                 'results': results
-            }, default=str)
+            })
         }
         
         logger.info(f"Execution complete: {successful}/{total} policies successful, {sqs_stats.get('published', 0)} real-time notifications sent")
@@ -367,7 +789,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         logger.error(f"Unexpected error: {str(e)}", exc_info=True)
         return {
             'statusCode': 500,
-            'body': json.dumps({
+            'body': dumps({
                 'success': False,
                 'error': str(e)
             })
@@ -17,6 +17,7 @@ import logging
 import os
 import boto3
 import base64
+import itertools
 import zlib
 import time
 from datetime import datetime
@@ -25,7 +26,13 @@ from abc import ABC, abstractmethod
 from botocore.exceptions import ClientError
 from jinja2 import Template, Environment, FileSystemLoader
 
-logger = logging.getLogger()
+# Optional import - fall back to stdlib json if orjson is not in the layer
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
 
 # AWS clients
 sqs = boto3.client('sqs')
@@ -305,7 +312,11 @@ def decode_sqs_message(body: str) -> Dict[str, Any]:
     try:
         decoded_bytes = base64.b64decode(body)
         decompressed = zlib.decompress(decoded_bytes)
-        message_data = json.loads(decompressed.decode('utf-8'))
+        # orjson parses the decompressed bytes directly (no intermediate str)
+        if orjson is not None:
+            message_data = orjson.loads(decompressed)
+        else:
+            message_data = json.loads(decompressed.decode('utf-8'))
         return message_data
     except Exception as e:
         logger.error(f"Failed to decode SQS message: {str(e)}")
@@ -358,8 +369,14 @@ def format_html_notification(policy_name: str, action: Dict[str, Any], resources
         <h3>Resources:</h3>
 """
     
-    for idx, resource in enumerate(resources[:10], 1):
-        resource_id = resource.get('id', resource.get('InstanceId', resource.get('ImageId', 'N/A')))
+    for idx, resource in enumerate(itertools.islice(resources, 10), 1):
+        # First identifier key present - avoids eagerly evaluating nested .get() defaults
+        if 'id' in resource:
+            resource_id = resource['id']
+        elif 'InstanceId' in resource:
+            resource_id = resource['InstanceId']
+        else:
+            resource_id = resource.get('ImageId', 'N/A')
         resource_type = resource.get('c7n:resource-type', 'resource')
         
         # Extract user information
@@ -638,17 +655,17 @@ def process_realtime_sqs_messages(invocation_id: Optional[str] = None) -> Dict[s
                 if messages_processed == 0:
                     logger.info(f"")
                     logger.info(f"📋 DECODED CUSTODIAN DATA STRUCTURE:")
-                    logger.info(f"   Full JSON (first 2000 chars): {json.dumps(custodian_data, default=str)[:2000]}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("   Full JSON (first 2000 chars): %s", json.dumps(custodian_data, default=str)[:2000])
                     logger.info(f"   Keys: {list(custodian_data.keys())}")
                 
                 # DEBUG: Log decoded custodian_data structure (first message only)
                 if messages_processed == 0:
                     logger.info(f"")
                     logger.info(f"📋 DECODED CUSTODIAN DATA STRUCTURE:")
-                    logger.info(f"   Full JSON (complete):")
-                    # Log complete JSON structure
-                    full_json = json.dumps(custodian_data, default=str, indent=2)
-                    logger.info(full_json)
+                    # Log complete JSON structure only when DEBUG is enabled
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("   Full JSON (complete):\n%s", json.dumps(custodian_data, default=str, indent=2))
                     logger.info(f"")
                     logger.info(f"📋 Sample custodian_data keys: {list(custodian_data.keys())}")
                     logger.info(f"📋 Policy data: {custodian_data.get('policy', {})}")
@@ -658,10 +675,9 @@ def process_realtime_sqs_messages(invocation_id: Optional[str] = None) -> Dict[s
                     if event_data:
                         event_keys = list(event_data.keys())
                         logger.info(f"📋 Event context found with keys: {event_keys}")
-                        logger.info(f"   Event JSON (complete):")
-                        # Log complete event JSON
-                        event_json = json.dumps(event_data, default=str, indent=2)
-                        logger.info(event_json)
+                        # Log complete event JSON only when DEBUG is enabled
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("   Event JSON (complete):\n%s", json.dumps(event_data, default=str, indent=2))
                         logger.info(f"")
                         # For Security Hub, log finding details if present
                         if 'detail' in event_data:
@@ -776,7 +792,7 @@ def process_realtime_sqs_messages(invocation_id: Optional[str] = None) -> Dict[s
                 user_details = []  # Track unique users who created resources
                 
                 # Use handler to format each resource
-                for resource in resources[:5]:  # Limit to first 5 resources
+                for resource in itertools.islice(resources, 5):  # Limit to first 5 resources
                     formatted = handler.format_resource_summary(resource)
                     resource_summary.append(formatted)
                     
@@ -874,7 +890,7 @@ def process_realtime_sqs_messages(invocation_id: Optional[str] = None) -> Dict[s
                             # Multiple resources - render for each and combine
                             rendered_messages = []
                             template = Template(message_body)
-                            for resource in resources[:10]:  # Limit to first 10 to avoid huge emails
+                            for resource in itertools.islice(resources, 10):  # Limit to first 10 to avoid huge emails
                                 context = {
                                     **template_vars,
                                     'resource': resource
@@ -0,0 +1,129 @@
+"""
+Unit tests for per-thread sessions and the SQS invocation-ID hook in cross_account_executor.py
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import the modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+import botocore.client
+import pytest
+
+import cross_account_executor
+from cross_account_executor import CrossAccountExecutor
+
+
+def _credentials(access_key):
+    return {'AccessKeyId': access_key, 'SecretAccessKey': 'secret', 'SessionToken': 'token'}
+
+
+@pytest.fixture(autouse=True)
+def thread_sessions(monkeypatch):
+    """Fresh per-thread session cache for each test"""
+    monkeypatch.setattr(cross_account_executor, '_thread_sessions', threading.local())
+
+
+class TestThreadSessions:
+    """boto3 sessions private to each policy thread and reused across invocations"""
+
+    def _session_in_thread(self, executor):
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(executor.get_thread_session()))
+        thread.start()
+        thread.join()
+        return sessions[0]
+
+    def test_threads_get_distinct_sessions(self):
+        executor = CrossAccountExecutor('111111111111', 'us-east-1')
+        executor.credentials = _credentials('AKIA1')
+
+        assert self._session_in_thread(executor) is not self._session_in_thread(executor)
+
+    def test_session_reused_by_later_executors_on_same_thread(self):
+        first = CrossAccountExecutor('111111111111', 'us-east-1')
+        first.credentials = _credentials('AKIA1')
+        second = CrossAccountExecutor('111111111111', 'us-east-1')
+        second.credentials = _credentials('AKIA1')
+
+        assert first.get_thread_session() is second.get_thread_session()
+
+    def test_session_rebuilt_when_credentials_change(self):
+        executor = CrossAccountExecutor('111111111111', 'us-east-1')
+        executor.credentials = _credentials('AKIA1')
+        session = executor.get_thread_session()
+
+        executor.credentials = _credentials('AKIA2')
+        rebuilt = executor.get_thread_session()
+
+        assert rebuilt is not session
+        assert rebuilt.get_credentials().access_key == 'AKIA2'
+        assert executor.get_thread_session() is rebuilt
+
+    def test_sessions_keyed_by_account_and_region(self):
+        central = CrossAccountExecutor('111111111111', 'us-east-1')
+        other_region = CrossAccountExecutor('111111111111', 'eu-west-1')
+
+        assert central.get_thread_session() is not other_region.get_thread_session()
+        assert other_region.get_thread_session().region_name == 'eu-west-1'
+
+
+class TestInvocationIdHook:
+    """botocore patch that tags SQS SendMessage calls with the invocation ID"""
+
+    @pytest.fixture
+    def base_client(self, monkeypatch):
+        original = MagicMock(return_value={})
+        monkeypatch.setattr(botocore.client.BaseClient, '_make_api_call', original, raising=False)
+        monkeypatch.delattr(botocore.client.BaseClient, '_original_make_api_call', raising=False)
+        yield original
+        # monkeypatch restores _make_api_call; drop the saved original it cannot track
+        if '_original_make_api_call' in vars(botocore.client.BaseClient):
+            del botocore.client.BaseClient._original_make_api_call
+
+    @staticmethod
+    def _client(service_name):
+        client = MagicMock()
+        client._service_model.service_name = service_name
+        return client
+
+    def test_installed_once_across_threads(self, base_client):
+        threads = [threading.Thread(target=cross_account_executor.install_invocation_id_hook) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        hook = botocore.client.BaseClient._make_api_call
+
+        cross_account_executor.install_invocation_id_hook()
+
+        assert botocore.client.BaseClient._original_make_api_call is base_client
+        assert botocore.client.BaseClient._make_api_call is hook
+        assert hook is not base_client
+
+    def test_tags_sqs_send_message_with_current_invocation(self, base_client, monkeypatch):
+        cross_account_executor.install_invocation_id_hook()
+        hook = botocore.client.BaseClient._make_api_call
+
+        monkeypatch.setenv('C7N_INVOCATION_ID', 'inv-1')
+        hook(self._client('sqs'), 'SendMessage', {'QueueUrl': 'q'})
+        monkeypatch.setenv('C7N_INVOCATION_ID', 'inv-2')
+        params = {'QueueUrl': 'q'}
+        hook(self._client('sqs'), 'SendMessage', params)
+
+        assert params['MessageAttributes']['InvocationId'] == {'StringValue': 'inv-2', 'DataType': 'String'}
+        assert base_client.call_count == 2
+
+    def test_other_operations_untouched(self, base_client, monkeypatch):
+        cross_account_executor.install_invocation_id_hook()
+        monkeypatch.setenv('C7N_INVOCATION_ID', 'inv-1')
+        params = {'Bucket': 'b'}
+
+        botocore.client.BaseClient._make_api_call(self._client('s3'), 'ListObjects', params)
+
+        assert params == {'Bucket': 'b'}
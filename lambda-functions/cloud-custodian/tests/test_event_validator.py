@@ -0,0 +1,185 @@
+"""
+Unit tests for event shape checks and lookups in event_validator.py
+"""
+
+import copy
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import the modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from event_validator import (
+    CLOUDTRAIL_DETAIL_TYPE,
+    EventValidator,
+    GUARDDUTY_DETAIL_TYPE,
+    SECURITYHUB_DETAIL_TYPE,
+    _dig,
+    check_event_shape,
+    get_event_name,
+    validate_event,
+)
+
+
+@pytest.fixture
+def cloudtrail_event():
+    """Load the sample CloudTrail RunInstances event"""
+    with open(Path(__file__).parent / 'data' / 'sample_event.json', 'r') as f:
+        return json.load(f)
+
+
+class TestCheckEventShape:
+    """Top-level event shape checks run before any extraction"""
+
+    def test_valid_event(self, cloudtrail_event):
+        check_event_shape(cloudtrail_event)
+
+    @pytest.mark.parametrize('event', [None, ['x'], 'event', 42])
+    def test_rejects_non_object(self, event):
+        with pytest.raises(ValueError, match='expected a JSON object'):
+            check_event_shape(event)
+
+    @pytest.mark.parametrize('field', ['detail-type', 'detail'])
+    def test_rejects_missing_field(self, cloudtrail_event, field):
+        del cloudtrail_event[field]
+        with pytest.raises(ValueError, match=f"missing '{field}' field"):
+            check_event_shape(cloudtrail_event)
+
+    def test_rejects_empty_detail(self, cloudtrail_event):
+        cloudtrail_event['detail'] = {}
+        with pytest.raises(ValueError, match="missing 'detail' field"):
+            check_event_shape(cloudtrail_event)
+
+    def test_rejects_mistyped_detail(self, cloudtrail_event):
+        cloudtrail_event['detail'] = ['not', 'a', 'dict']
+        with pytest.raises(ValueError, match="'detail' must be of type dict"):
+            check_event_shape(cloudtrail_event)
+
+
+class TestGetEventName:
+    """Cheap mapping-key resolution used by the handler before full validation"""
+
+    def test_cloudtrail_uses_event_name(self, cloudtrail_event):
+        assert get_event_name(cloudtrail_event) == 'RunInstances'
+
+    def test_cloudtrail_without_event_name(self, cloudtrail_event):
+        del cloudtrail_event['detail']['eventName']
+        assert get_event_name(cloudtrail_event) == ''
+
+    @pytest.mark.parametrize('detail_type', [SECURITYHUB_DETAIL_TYPE, GUARDDUTY_DETAIL_TYPE])
+    def test_findings_use_detail_type(self, detail_type):
+        event = {'detail-type': detail_type, 'detail': {'id': 'finding-1'}}
+        assert get_event_name(event) == detail_type
+
+    def test_rejects_unsupported_detail_type(self, cloudtrail_event):
+        cloudtrail_event['detail-type'] = 'EC2 Instance State-change Notification'
+        with pytest.raises(ValueError, match='Unsupported event type'):
+            get_event_name(cloudtrail_event)
+
+    def test_rejects_bad_shape(self):
+        with pytest.raises(ValueError, match='expected a JSON object'):
+            get_event_name(None)
+
+    def test_does_not_modify_event(self, cloudtrail_event):
+        original = copy.deepcopy(cloudtrail_event)
+        get_event_name(cloudtrail_event)
+        assert cloudtrail_event == original
+        assert cloudtrail_event['detail-type'] == CLOUDTRAIL_DETAIL_TYPE
+
+
+class TestLegacyValidateEvent:
+    """Module-level validate_event used by the handler"""
+
+    def test_reports_bad_shape(self):
+        result = validate_event(None)
+        assert result['valid'] is False
+        assert 'expected a JSON object' in result['error']
+
+    def test_shape_checked_skips_second_check(self, cloudtrail_event, monkeypatch):
+        import event_validator
+        monkeypatch.setattr(event_validator, 'check_event_shape', lambda event: pytest.fail('checked twice'))
+
+        result = validate_event(cloudtrail_event, shape_checked=True)
+
+        assert result['valid'] is True
+        assert result['event_info']['event_name'] == 'RunInstances'
+
+
+class TestDig:
+    """Nested lookups used by the CloudTrail resource extractors"""
+
+    def test_walks_dicts_and_lists(self):
+        data = {'instancesSet': {'items': [{'instanceId': 'i-1'}, {'instanceId': 'i-2'}]}}
+        assert _dig(data, 'instancesSet', 'items', 0, 'instanceId') == 'i-1'
+        assert _dig(data, 'instancesSet', 'items', -1, 'instanceId') == 'i-2'
+
+    def test_no_path_returns_object(self):
+        data = {'a': 1}
+        assert _dig(data) is data
+
+    @pytest.mark.parametrize('path', [
+        ('missing',),
+        ('instancesSet', 'missing'),
+        ('instancesSet', 'items', 5),
+        ('instancesSet', 'items', -3),
+        ('instancesSet', 'items', 'instanceId'),
+        ('instancesSet', 'items', 0, 'instanceId', 'deeper'),
+    ])
+    def test_missing_steps_return_none(self, path):
+        data = {'instancesSet': {'items': [{'instanceId': 'i-1'}]}}
+        assert _dig(data, *path) is None
+
+    def test_explicit_none_stops_walk(self):
+        assert _dig({'a': None}, 'a', 'b') is None
+
+    def test_non_container_root(self):
+        assert _dig(None, 'a') is None
+        assert _dig('string', 0) is None
+
+
+@pytest.fixture
+def validator(cloudtrail_event, monkeypatch):
+    """Validator mapping the sample event's account and eventName to two policies"""
+    monkeypatch.setenv('POLICY_BUCKET', 'policy-bucket')
+    monkeypatch.setenv('POLICY_PREFIX', 'policies/')
+    return EventValidator({
+        'account_mapping': {
+            cloudtrail_event['account']: {
+                'event_mapping': {
+                    'RunInstances': [
+                        {'source_file': 'aws-ec2.yml', 'policy_name': 'ec2-a', 'resource': 'aws.ec2'},
+                        {'source_file': 'aws-ec2.yml', 'policy_name': 'ec2-b', 'resource': 'aws.ec2'},
+                    ]
+                }
+            }
+        }
+    })
+
+
+class TestPolicyDetails:
+    """Policy configs built for the event's account and event name"""
+
+    def test_returns_plain_policy_configs(self, validator, cloudtrail_event):
+        policies = validator.get_policy_details(cloudtrail_event)['policies']
+
+        assert [p['policy_name'] for p in policies] == ['ec2-a', 'ec2-b']
+        assert all(type(p) is dict for p in policies)
+        assert policies[0]['s3_key'] == 'policies/aws-ec2.yml'
+        assert policies[0]['target_account'] == cloudtrail_event['account']
+        assert json.loads(json.dumps(policies)) == policies
+
+    def test_caller_changes_do_not_leak(self, validator, cloudtrail_event):
+        first = validator.get_policy_details(cloudtrail_event)['policies']
+        first[0]['policy_name'] = 'changed'
+
+        second = validator.get_policy_details(copy.deepcopy(cloudtrail_event))['policies']
+
+        assert second[0]['policy_name'] == 'ec2-a'
+
+    def test_unmapped_event(self, validator, cloudtrail_event):
+        cloudtrail_event['detail']['eventName'] = 'DescribeInstances'
+        with pytest.raises(ValueError, match='No policies found'):
+            validator.get_policy_details(cloudtrail_event)
@@ -0,0 +1,401 @@
+"""
+Unit tests for S3 caching and policy lookup in lambda_handler.py
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import the modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+# realtime_notifier creates boto3 clients at import time
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+import pytest
+from botocore.exceptions import ClientError
+
+import lambda_handler
+
+
+def _client_error(code):
+    return ClientError({'Error': {'Code': code, 'Message': code}}, 'GetObject')
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    """Stub S3 client with an empty object cache"""
+    client = MagicMock()
+    monkeypatch.setattr(lambda_handler, 'POLICY_BUCKET', 'policy-bucket')
+    monkeypatch.setattr(lambda_handler, '_s3_object_cache', {})
+    monkeypatch.setattr(lambda_handler, 'get_s3_client', lambda: client)
+    return client
+
+
+class TestGetCachedS3Object:
+    """ETag-revalidated cache in front of GetObject"""
+
+    def test_first_fetch_parses_and_caches(self, s3_client):
+        s3_client.get_object.return_value = {'Body': io.BytesIO(b'{"a": 1}'), 'ETag': '"v1"'}
+        parse = MagicMock(side_effect=lambda response: lambda_handler.loads(response['Body'].read()))
+
+        assert lambda_handler.get_cached_s3_object('config/a.json', parse) == {'a': 1}
+        s3_client.get_object.assert_called_once_with(Bucket='policy-bucket', Key='config/a.json')
+        assert parse.call_count == 1
+
+    def test_not_modified_returns_cached_copy(self, s3_client):
+        s3_client.get_object.side_effect = [
+            {'Body': io.BytesIO(b'{"a": 1}'), 'ETag': '"v1"'},
+            _client_error('304'),
+        ]
+        parse = MagicMock(side_effect=lambda response: lambda_handler.loads(response['Body'].read()))
+
+        first = lambda_handler.get_cached_s3_object('config/a.json', parse)
+        second = lambda_handler.get_cached_s3_object('config/a.json', parse)
+
+        assert second is first
+        assert parse.call_count == 1
+        s3_client.get_object.assert_called_with(
+            Bucket='policy-bucket', Key='config/a.json', IfNoneMatch='"v1"'
+        )
+
+    def test_changed_object_is_reparsed(self, s3_client):
+        s3_client.get_object.side_effect = [
+            {'Body': io.BytesIO(b'{"a": 1}'), 'ETag': '"v1"'},
+            {'Body': io.BytesIO(b'{"a": 2}'), 'ETag': '"v2"'},
+            _client_error('NotModified'),
+        ]
+        parse = lambda response: lambda_handler.loads(response['Body'].read())
+
+        assert lambda_handler.get_cached_s3_object('config/a.json', parse) == {'a': 1}
+        assert lambda_handler.get_cached_s3_object('config/a.json', parse) == {'a': 2}
+        assert lambda_handler.get_cached_s3_object('config/a.json', parse) == {'a': 2}
+        s3_client.get_object.assert_called_with(
+            Bucket='policy-bucket', Key='config/a.json', IfNoneMatch='"v2"'
+        )
+
+    def test_other_errors_propagate(self, s3_client):
+        s3_client.get_object.side_effect = _client_error('NoSuchKey')
+        with pytest.raises(ClientError):
+            lambda_handler.get_cached_s3_object('config/missing.json', lambda response: None)
+
+    def test_not_modified_without_cache_propagates(self, s3_client):
+        s3_client.get_object.side_effect = _client_error('304')
+        with pytest.raises(ClientError):
+            lambda_handler.get_cached_s3_object('config/a.json', lambda response: None)
+
+
+class TestPolicyIndex:
+    """(account, event) index over the account policy mapping"""
+
+    @pytest.fixture
+    def mapping(self):
+        return {
+            'account_mapping': {
+                '111111111111': {
+                    'name': 'dev',
+                    'event_mapping': {
+                        'RunInstances': [
+                            {'source_file': 'aws-ec2.yml', 'policy_name': 'ec2-a'},
+                            {'source_file': 'aws-ec2.yml', 'policy_name': 'ec2-b'},
+                            {'source_file': 'aws-tags.yml', 'policy_name': 'tags-a'},
+                        ],
+                        'CreateBucket': [
+                            {'source_file': 'aws-s3.yml', 'policy_name': 's3-a'},
+                        ],
+                    },
+                },
+                '222222222222': {'event_mapping': {}},
+            }
+        }
+
+    def test_groups_policies_by_file(self, mapping):
+        index = lambda_handler.build_policy_index(mapping)
+        assert index == {
+            ('111111111111', 'RunInstances'): {'aws-ec2': ['ec2-a', 'ec2-b'], 'aws-tags': ['tags-a']},
+            ('111111111111', 'CreateBucket'): {'aws-s3': ['s3-a']},
+        }
+
+    def test_empty_mapping(self):
+        assert lambda_handler.build_policy_index({}) == {}
+
+    def test_lookup_uses_index(self, mapping, monkeypatch):
+        monkeypatch.setattr(lambda_handler, '_policy_index', None)
+        assert lambda_handler.get_policies_for_event('111111111111', 'CreateBucket', mapping) == {
+            'aws-s3': ['s3-a']
+        }
+        assert lambda_handler.get_policies_for_event('111111111111', 'DeleteBucket', mapping) == {}
+        assert lambda_handler.get_policies_for_event('999999999999', 'RunInstances', mapping) == {}
+
+    def test_index_rebuilt_for_new_mapping(self, mapping, monkeypatch):
+        monkeypatch.setattr(lambda_handler, '_policy_index', None)
+        lambda_handler.get_policies_for_event('111111111111', 'RunInstances', mapping)
+
+        updated = {'account_mapping': {'111111111111': {'event_mapping': {
+            'RunInstances': [{'source_file': 'aws-new.yml', 'policy_name': 'new-a'}]
+        }}}}
+        assert lambda_handler.get_policies_for_event('111111111111', 'RunInstances', updated) == {
+            'aws-new': ['new-a']
+        }
+
+
+class TestHandlerRejectsMalformedEvents:
+    """Malformed payloads are rejected with a 400 before any processing"""
+
+    @pytest.mark.parametrize('event', [None, ['x'], 'event'])
+    def test_non_object_event(self, event):
+        response = lambda_handler.handler(event, None)
+        assert response['statusCode'] == 400
+
+    def test_unsupported_detail_type(self):
+        event = {'account': '111111111111', 'detail-type': 'Scheduled Event', 'detail': {'a': 1}}
+        response = lambda_handler.handler(event, None)
+        assert response['statusCode'] == 400
+        assert 'Unsupported event type' in lambda_handler.loads(response['body'])['error']
+
+
+class TestLoadPolicyFromS3:
+    """Policy YAML parsed from the S3 stream and cached by ETag"""
+
+    def test_parses_yaml_and_returns_copies(self, s3_client):
+        s3_client.get_object.side_effect = [
+            {'Body': io.BytesIO(b'policies:\n- name: ec2-a\n  resource: aws.ec2\n'), 'ETag': '"v1"'},
+            _client_error('304'),
+        ]
+
+        first = lambda_handler.load_policy_from_s3('aws-ec2')
+        first[0]['filters'] = ['mutated']
+        second = lambda_handler.load_policy_from_s3('aws-ec2')
+
+        assert second == [{'name': 'ec2-a', 'resource': 'aws.ec2'}]
+        s3_client.get_object.assert_called_with(
+            Bucket='policy-bucket', Key='policies/aws-ec2.yml', IfNoneMatch='"v1"'
+        )
+        assert s3_client.get_object.call_count == 2
+
+    def test_single_policy_file_is_wrapped(self, s3_client):
+        s3_client.get_object.return_value = {'Body': io.BytesIO(b'name: solo\nresource: aws.s3\n'), 'ETag': '"v1"'}
+        assert lambda_handler.load_policy_from_s3('solo') == [{'name': 'solo', 'resource': 'aws.s3'}]
+
+
+@pytest.fixture
+def cloudtrail_event():
+    """Load the sample CloudTrail RunInstances event"""
+    with open(Path(__file__).parent / 'data' / 'sample_event.json', 'r') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def mapped_handler(cloudtrail_event, monkeypatch):
+    """Handler wired to three mapped policies with S3, STS and SQS stubbed out"""
+    account = cloudtrail_event['account']
+    mapping = {'account_mapping': {account: {'event_mapping': {'RunInstances': [
+        {'source_file': 'aws-ec2.yml', 'policy_name': name} for name in ('ec2-a', 'ec2-b', 'ec2-c')
+    ]}}}}
+    monkeypatch.setattr(lambda_handler, '_policy_index', None)
+    monkeypatch.setattr(lambda_handler, 'FANOUT_THRESHOLD', 0)
+    monkeypatch.setattr(lambda_handler, 'RESOURCE_VALIDATOR_AVAILABLE', False)
+    monkeypatch.setattr(lambda_handler, 'load_account_policy_mapping', lambda: mapping)
+    monkeypatch.setattr(lambda_handler, 'load_policy_from_s3', lambda policy_file: [
+        {'name': name, 'resource': 'aws.ec2'} for name in ('ec2-a', 'ec2-b', 'ec2-c', 'ec2-unmapped')
+    ])
+    monkeypatch.setattr(lambda_handler, 'process_realtime_sqs_messages',
+                        lambda invocation_id: {'processed': 0, 'published': 0})
+    return mapping
+
+
+class TestEventShapeCheckedOnce:
+    """The handler checks the event shape at the entry point only"""
+
+    def test_single_shape_check_per_event(self, mapped_handler, cloudtrail_event, monkeypatch):
+        import event_validator
+        calls = []
+        check = event_validator.check_event_shape
+        monkeypatch.setattr(event_validator, 'check_event_shape', lambda event: calls.append(event) or check(event))
+        monkeypatch.setattr(lambda_handler, 'create_executor', lambda *args: RecordingExecutor())
+
+        response = lambda_handler.handler(cloudtrail_event, None)
+
+        assert response['statusCode'] == 200
+        assert len(calls) == 1
+
+
+class TestParallelPolicyExecution:
+    """Policies run on the shared worker pool when MAX_POLICY_WORKERS is raised"""
+
+    @pytest.fixture
+    def policy_pool(self, monkeypatch):
+        monkeypatch.setattr(lambda_handler, 'MAX_POLICY_WORKERS', 2)
+        monkeypatch.setattr(lambda_handler, '_policy_pool', None)
+        yield
+        lambda_handler._policy_pool.shutdown(wait=True)
+
+    def test_runs_policies_concurrently_and_collects_failures(
+        self, mapped_handler, policy_pool, cloudtrail_event, monkeypatch
+    ):
+        # ec2-a and ec2-b only get past the barrier if they run at the same time
+        barrier = threading.Barrier(2, timeout=5)
+        threads = {}
+
+        class Executor:
+            def execute_policy(self, policy_config, event_info):
+                name = policy_config['name']
+                threads[name] = threading.current_thread().name
+                if name != 'ec2-c':
+                    barrier.wait()
+                if name == 'ec2-b':
+                    raise RuntimeError('boom')
+                return {'policy_name': name, 'success': True}
+
+        monkeypatch.setattr(lambda_handler, 'create_executor', lambda *args: Executor())
+
+        response = lambda_handler.handler(cloudtrail_event, None)
+        body = lambda_handler.loads(response['body'])
+
+        assert response['statusCode'] == 200
+        assert [r['policy_name'] for r in body['results']] == ['ec2-a', 'ec2-b', 'ec2-c']
+        assert body['policies_successful'] == 2
+        assert body['results'][1] == {'policy_name': 'ec2-b', 'success': False, 'error': 'boom'}
+        assert threads['ec2-a'] != threads['ec2-b']
+        assert all(name.startswith('policy') for name in threads.values())
+
+    def test_pool_is_reused_across_invocations(self, policy_pool):
+        assert lambda_handler.get_policy_pool() is lambda_handler.get_policy_pool()
+
+
+class RecordingExecutor:
+    """Executor stand-in that records the policies it runs"""
+
+    def __init__(self):
+        self.ran = []
+
+    def execute_policy(self, policy_config, event_info):
+        self.ran.append(policy_config['name'])
+        return {'policy_name': policy_config['name'], 'success': True}
+
+
+class TestFanOut:
+    """Policies above FANOUT_THRESHOLD dispatched to async child invocations"""
+
+    @pytest.fixture
+    def lambda_client(self, mapped_handler, monkeypatch):
+        client = MagicMock()
+        monkeypatch.setattr(lambda_handler, 'FANOUT_THRESHOLD', 1)
+        monkeypatch.setattr(lambda_handler, 'get_lambda_client', lambda: client)
+        return client
+
+    @pytest.fixture
+    def context(self):
+        return MagicMock(function_name='custodian-executor', aws_request_id='req-1')
+
+    @pytest.fixture
+    def executor(self, monkeypatch):
+        executor = RecordingExecutor()
+        monkeypatch.setattr(lambda_handler, 'create_executor', lambda *args: executor)
+        return executor
+
+    def test_dispatches_policy_references_only(self, lambda_client, context, executor, cloudtrail_event):
+        response = lambda_handler.handler(cloudtrail_event, context)
+
+        assert response['statusCode'] == 202
+        assert lambda_handler.loads(response['body'])['policies_dispatched'] == 3
+        assert executor.ran == []
+        payloads = [lambda_handler.loads(call.kwargs['Payload']) for call in lambda_client.invoke.call_args_list]
+        assert [p['policy_name'] for p in payloads] == ['ec2-a', 'ec2-b', 'ec2-c']
+        assert payloads[0] == {
+            '_child': True,
+            'account_id': cloudtrail_event['account'],
+            'source_file': 'aws-ec2',
+            'policy_name': 'ec2-a',
+            'event': cloudtrail_event,
+        }
+        assert all(call.kwargs['InvocationType'] == 'Event' for call in lambda_client.invoke.call_args_list)
+
+    def test_failed_invoke_runs_locally(self, lambda_client, context, executor, cloudtrail_event):
+        lambda_client.invoke.side_effect = [None, RuntimeError('throttled'), None]
+
+        response = lambda_handler.handler(cloudtrail_event, context)
+        body = lambda_handler.loads(response['body'])
+
+        assert response['statusCode'] == 200
+        assert body['policies_dispatched'] == 2
+        assert executor.ran == ['ec2-b']
+
+    def test_oversized_payload_runs_locally(self, lambda_client, context, executor, cloudtrail_event, monkeypatch):
+        monkeypatch.setattr(lambda_handler, 'ASYNC_INVOKE_PAYLOAD_LIMIT', 1024)
+        cloudtrail_event['detail']['requestParameters'] = {'userData': 'x' * 2048}
+
+        response = lambda_handler.handler(cloudtrail_event, context)
+        body = lambda_handler.loads(response['body'])
+
+        assert response['statusCode'] == 200
+        assert body['policies_dispatched'] == 0
+        assert executor.ran == ['ec2-a', 'ec2-b', 'ec2-c']
+        lambda_client.invoke.assert_not_called()
+
+
+class TestChildInvocation:
+    """Child invocations only run policies the account mapping allows"""
+
+    @pytest.fixture
+    def executor(self, mapped_handler, monkeypatch):
+        executor = RecordingExecutor()
+        created = []
+        monkeypatch.setattr(lambda_handler, 'create_executor',
+                            lambda *args: created.append(args) or executor)
+        executor.created = created
+        return executor
+
+    @staticmethod
+    def _payload(source_event, **overrides):
+        payload = {
+            '_child': True,
+            'account_id': source_event['account'],
+            'source_file': 'aws-ec2',
+            'policy_name': 'ec2-b',
+            'event': source_event,
+        }
+        payload.update(overrides)
+        return payload
+
+    def test_runs_mapped_policy_from_bucket(self, executor, cloudtrail_event):
+        payload = self._payload(cloudtrail_event, policy_config={'name': 'ec2-b', 'actions': ['terminate']})
+
+        response = lambda_handler.handler(payload, None)
+
+        assert response['statusCode'] == 200
+        assert executor.ran == ['ec2-b']
+        assert executor.created == [(cloudtrail_event['account'], cloudtrail_event['region'], 'unknown')]
+
+    @pytest.mark.parametrize('overrides', [
+        {'policy_name': 'ec2-unmapped'},
+        {'source_file': 'aws-other'},
+    ])
+    def test_rejects_unmapped_policy(self, executor, cloudtrail_event, overrides):
+        response = lambda_handler.handler(self._payload(cloudtrail_event, **overrides), None)
+
+        assert response['statusCode'] == 403
+        assert executor.created == []
+
+    def test_rejects_event_not_mapped_for_account(self, executor, cloudtrail_event):
+        cloudtrail_event['detail']['eventName'] = 'TerminateInstances'
+
+        response = lambda_handler.handler(self._payload(cloudtrail_event), None)
+
+        assert response['statusCode'] == 403
+        assert executor.created == []
+
+    def test_rejects_account_mismatch(self, executor, cloudtrail_event):
+        response = lambda_handler.handler(self._payload(cloudtrail_event, account_id='999999999999'), None)
+
+        assert response['statusCode'] == 400
+        assert executor.created == []
+
+    def test_rejects_malformed_event(self, executor, cloudtrail_event):
+        response = lambda_handler.handler(self._payload(cloudtrail_event, event=None), None)
+
+        assert response['statusCode'] == 400
+        assert executor.created == []
@@ -6,9 +6,28 @@ Validates policy files for correct structure and common issues
 
 import yaml
 import json
+import collections
+import itertools
+import shutil
+import subprocess
 import sys
+import threading
 from pathlib import Path
 
+POLICY_FILES = [
+    'aws-s3-ransomware-protection.yml',
+    'aws-s3-ransomware-metrics.yml',
+]
+
+# Cap on reported structural issues per file
+MAX_ISSUES = 100
+
+# Lines of custodian validate output kept for the report
+OUTPUT_TAIL_LINES = 100
+
+# Seconds before a hung custodian validate run is killed
+CUSTODIAN_TIMEOUT = 300
+
 def validate_yaml_file(file_path):
     """Validate YAML syntax"""
     try:
@@ -27,22 +46,20 @@ def validate_json_file(file_path):
     except json.JSONDecodeError as e:
         return False, None, str(e)
 
-def validate_policy_structure(policy_data):
-    """Validate Cloud Custodian policy structure"""
-    issues = []
-    
+def iter_issues(policy_data):
+    """Yield Cloud Custodian policy structure issues"""
     if not isinstance(policy_data, dict):
-        issues.append("Root element must be a dictionary")
-        return issues
+        yield "Root element must be a dictionary"
+        return
     
     if 'policies' not in policy_data:
-        issues.append("Missing 'policies' key at root level")
-        return issues
+        yield "Missing 'policies' key at root level"
+        return
     
     policies = policy_data['policies']
     if not isinstance(policies, list):
-        issues.append("'policies' must be a list")
-        return issues
+        yield "'policies' must be a list"
+        return
     
     for idx, policy in enumerate(policies):
         policy_name = policy.get('name', f'policy-{idx}')
@@ -51,56 +68,80 @@ def validate_policy_structure(policy_data):
         required_fields = ['name', 'resource']
         for field in required_fields:
             if field not in policy:
-                issues.append(f"Policy '{policy_name}': Missing required field '{field}'")
+                yield f"Policy '{policy_name}': Missing required field '{field}'"
         
         # Check resource format
         if 'resource' in policy:
             resource = policy['resource']
             if not resource.startswith('aws.'):
-                issues.append(f"Policy '{policy_name}': Resource should start with 'aws.' (got: {resource})")
+                yield f"Policy '{policy_name}': Resource should start with 'aws.' (got: {resource})"
         
         # Check actions structure
         if 'actions' in policy:
             actions = policy['actions']
             if not isinstance(actions, list):
-                issues.append(f"Policy '{policy_name}': 'actions' must be a list")
+                yield f"Policy '{policy_name}': 'actions' must be a list"
             else:
                 for action_idx, action in enumerate(actions):
                     if isinstance(action, dict):
                         if 'type' not in action:
-                            issues.append(f"Policy '{policy_name}': Action {action_idx} missing 'type' field")
+                            yield f"Policy '{policy_name}': Action {action_idx} missing 'type' field"
                         
                         # Check notify action structure
                         if action.get('type') == 'notify':
                             notify_required = ['template', 'subject', 'to', 'transport']
                             for field in notify_required:
                                 if field not in action:
-                                    issues.append(f"Policy '{policy_name}': notify action missing '{field}'")
+                                    yield f"Policy '{policy_name}': notify action missing '{field}'"
                             
                             if 'transport' in action:
                                 transport = action['transport']
                                 if isinstance(transport, dict):
                                     if 'type' not in transport:
-                                        issues.append(f"Policy '{policy_name}': notify transport missing 'type'")
+                                        yield f"Policy '{policy_name}': notify transport missing 'type'"
                                     if transport.get('type') == 'sqs' and 'queue' not in transport:
-                                        issues.append(f"Policy '{policy_name}': SQS transport missing 'queue' URL")
+                                        yield f"Policy '{policy_name}': SQS transport missing 'queue' URL"
         
         # Check filters structure
         if 'filters' in policy:
             filters = policy['filters']
             if not isinstance(filters, list):
-                issues.append(f"Policy '{policy_name}': 'filters' must be a list")
+                yield f"Policy '{policy_name}': 'filters' must be a list"
             else:
                 for filter_idx, filt in enumerate(filters):
                     if isinstance(filt, dict) and 'type' not in filt and not any(k in filt for k in ['or', 'and', 'not']):
                         # Only issue warning if it's not a logical operator
-                        issues.append(f"Policy '{policy_name}': Filter {filter_idx} missing 'type' field")
+                        yield f"Policy '{policy_name}': Filter {filter_idx} missing 'type' field"
         
         # Warn if mode is present (not needed in event-driven architecture)
         if 'mode' in policy:
-            issues.append(f"Policy '{policy_name}': WARNING - 'mode' field present but not needed for event-driven execution")
+            yield f"Policy '{policy_name}': WARNING - 'mode' field present but not needed for event-driven execution"
+
+def validate_with_custodian(file_paths):
+    """Validate policy files against the c7n schema in a single custodian run"""
+    custodian = shutil.which('custodian')
+    if not custodian:
+        return None, "custodian CLI not found"
     
-    return issues
+    # Stream raw output line by line, keeping only the tail and decoding it once.
+    # The reader thread keeps the pipe drained while wait() enforces the timeout.
+    tail = collections.deque(maxlen=OUTPUT_TAIL_LINES)
+    with subprocess.Popen(
+        [custodian, 'validate', *[str(p) for p in file_paths]],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT
+    ) as proc:
+        reader = threading.Thread(target=tail.extend, args=(proc.stdout,), daemon=True)
+        reader.start()
+        try:
+            proc.wait(timeout=CUSTODIAN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            reader.join()
+            return False, f"custodian validate timed out after {CUSTODIAN_TIMEOUT}s"
+        reader.join()
+    return proc.returncode == 0, b"".join(tail).decode('utf-8', 'replace').strip()
 
 def validate_event_mapping(mapping_data):
     """Validate account-policy-mapping.json structure"""
@@ -132,85 +173,104 @@ def validate_event_mapping(mapping_data):
     
     return issues
 
-def main():
-    print("=" * 70)
-    print("Cloud Custodian Policy Validation")
-    print("=" * 70)
-    print()
-    
-    base_path = Path(__file__).parent.parent
+def check_policy_files(base_path, emit):
+    """Check policy files and emit report lines, returning True if all passed"""
     all_valid = True
     
-    # Validate ransomware protection policies
-    print("📝 Validating aws-s3-ransomware-protection.yml...")
-    file_path = base_path / 'c7n' / 'policies' / 'aws-s3-ransomware-protection.yml'
-    valid, data, error = validate_yaml_file(file_path)
-    
-    if not valid:
-        print(f"  ❌ YAML Syntax Error: {error}")
-        all_valid = False
-    else:
-        print("  ✅ Valid YAML syntax")
-        issues = validate_policy_structure(data)
-        if issues:
-            print(f"  ⚠️  Found {len(issues)} issue(s):")
-            for issue in issues:
-                print(f"     - {issue}")
+    # Check YAML syntax of each policy file
+    policy_paths = []
+    parsed = {}
+    for file_name in POLICY_FILES:
+        emit(f"📝 Validating {file_name}...")
+        file_path = base_path / 'c7n' / 'policies' / file_name
+        valid, data, error = validate_yaml_file(file_path)
+        
+        if not valid:
+            emit(f"  ❌ YAML Syntax Error: {error}")
             all_valid = False
         else:
-            print("  ✅ Policy structure valid")
-    
-    print()
+            emit("  ✅ Valid YAML syntax")
+            policy_paths.append(file_path)
+            parsed[file_name] = data
+        
+        emit("")
     
-    # Validate ransomware metrics policies
-    print("📝 Validating aws-s3-ransomware-metrics.yml...")
-    file_path = base_path / 'c7n' / 'policies' / 'aws-s3-ransomware-metrics.yml'
-    valid, data, error = validate_yaml_file(file_path)
+    # Repo-specific structure checks (mode, notify fields, SQS queue) always run
+    if parsed:
+        emit("📝 Checking policy structure...")
+        for file_name, data in parsed.items():
+            issues = list(itertools.islice(iter_issues(data), MAX_ISSUES))
+            if issues:
+                emit(f"  ⚠️  {file_name}: found {len(issues)} issue(s):")
+                emit("\n".join(f"     - {issue}" for issue in issues))
+                all_valid = False
+            else:
+                emit(f"  ✅ {file_name}: policy structure valid")
+        
+        emit("")
     
-    if not valid:
-        print(f"  ❌ YAML Syntax Error: {error}")
-        all_valid = False
-    else:
-        print("  ✅ Valid YAML syntax")
-        issues = validate_policy_structure(data)
-        if issues:
-            print(f"  ⚠️  Found {len(issues)} issue(s):")
-            for issue in issues:
-                print(f"     - {issue}")
+    # Schema-validate all policy files with one custodian invocation
+    if policy_paths:
+        emit("📝 Running custodian validate...")
+        valid, output = validate_with_custodian(policy_paths)
+        
+        if valid is None:
+            emit(f"  ⚠️  {output}, skipping schema validation")
+        elif not valid:
+            emit("  ❌ custodian validate failed:")
+            emit("\n".join(f"     {line}" for line in output.splitlines()))
             all_valid = False
         else:
-            print("  ✅ Policy structure valid")
-    
-    print()
+            emit("  ✅ Policy schema valid")
+        
+        emit("")
     
-    # Validate account-policy-mapping.json
-    print("📝 Validating account-policy-mapping.json...")
+    return all_valid
+
+def check_mapping_file(base_path, emit):
+    """Check account-policy-mapping.json and emit report lines, returning True if it parsed"""
+    emit("📝 Validating account-policy-mapping.json...")
     file_path = base_path / 'c7n' / 'config' / 'account-policy-mapping.json'
     valid, data, error = validate_json_file(file_path)
     
     if not valid:
-        print(f"  ❌ JSON Syntax Error: {error}")
-        all_valid = False
+        emit(f"  ❌ JSON Syntax Error: {error}")
     else:
-        print("  ✅ Valid JSON syntax")
+        emit("  ✅ Valid JSON syntax")
         issues = validate_event_mapping(data)
         if issues:
-            print(f"  ⚠️  Found {len(issues)} issue(s):")
-            for issue in issues:
-                print(f"     - {issue}")
+            emit(f"  ⚠️  Found {len(issues)} issue(s):")
+            emit("\n".join(f"     - {issue}" for issue in issues))
             # Don't fail on mapping issues, just warn
         else:
-            print("  ✅ Event mapping structure valid")
+            emit("  ✅ Event mapping structure valid")
+    
+    emit("")
+    return valid
+
+def main():
+    # Collect the report and write it once at the end
+    buf = []
+    emit = buf.append
     
-    print()
-    print("=" * 70)
+    emit("=" * 70)
+    emit("Cloud Custodian Policy Validation")
+    emit("=" * 70)
+    emit("")
+    
+    base_path = Path(__file__).parent.parent
+    all_valid = check_policy_files(base_path, emit)
+    all_valid = check_mapping_file(base_path, emit) and all_valid
+    
+    emit("=" * 70)
     
     if all_valid:
-        print("✅ All validations passed!")
-        return 0
+        emit("✅ All validations passed!")
     else:
-        print("❌ Some validations failed. Please fix the issues above.")
-        return 1
+        emit("❌ Some validations failed. Please fix the issues above.")
+    
+    sys.stdout.write("\n".join(buf) + "\n")
+    return 0 if all_valid else 1
 
 if __name__ == '__main__':
     sys.exit(main())
@@ -137,6 +137,16 @@ variable "lambda_memory_size" {
   }
 }
 
+variable "policy_fanout_threshold" {
+  description = "Policy count above which the executor fans policies out to async self-invocations (0 disables fan-out)"
+  type        = number
+  default     = 4
+  validation {
+    condition     = var.policy_fanout_threshold >= 0
+    error_message = "Policy fan-out threshold must be 0 or greater."
+  }
+}
+
 variable "log_level" {
   description = "Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
   type        = string
@@ -882,6 +892,7 @@ resource "aws_lambda_function" "custodian_cross_account_executor" {
       TO_ADDRESSES            = var.mailer_contact_email
       TEMPLATES_BUCKET        = var.policy_bucket
       REGION                  = var.aws_region
+      FANOUT_THRESHOLD        = var.policy_fanout_threshold
     }
   }
 
@@ -1006,6 +1017,12 @@ resource "aws_iam_role_policy" "lambda_execution_policy" {
           "arn:aws:s3:::${var.policy_bucket}/*"
         ]
       },
+      {
+        Sid      = "SelfInvokeForPolicyFanout"
+        Effect   = "Allow"
+        Action   = "lambda:InvokeFunction"
+        Resource = "arn:aws:lambda:${var.aws_region}:${data.aws_caller_identity.current.account_id}:function:cloud-custodian-cross-account-executor"
+      },
       {
         Sid    = "CloudWatchLogs"
         Effect = "Allow"